@@ -0,0 +1,62 @@
+"""
+Benchmarks for the led matrix rendering path running on the emulated device
+"""
+# pylint: disable=protected-access,redefined-outer-name
+import pytest
+
+from sleepcounter.hardware_a.display.display import LedMatrix, _Message
+from sleepcounter.hardware_a.display.scheduler import FrameScheduler
+from sleepcounter.hardware_a.fonts import atlas
+
+MESSAGE = "Christmas in 2 sleeps . . . "
+
+
+@pytest.fixture
+def matrix(device):
+    matrix = LedMatrix(device)
+    # a clock that stands still means frames are neither paced nor dropped
+    matrix._scheduler = FrameScheduler(
+        matrix.scroll_rate, clock=lambda: 0.0, wait=lambda _: None)
+    return matrix
+
+
+def _compiled(matrix, messages):
+    matrix._to_display = messages
+    matrix._compile([message.key(matrix.device) for message in messages], {})
+    return matrix._frames
+
+
+def test_show_text_frame(benchmark, matrix):
+    frames = _compiled(matrix, [_Message(MESSAGE, scroll=False)])[0]
+    benchmark(matrix._show_frame, frames[0])
+
+
+def test_scroll_text_sustained(benchmark, matrix):
+    frames = _compiled(matrix, [_Message(MESSAGE, scroll=True)])[0]
+    # the playlist sets the message being scrolled before scrolling it
+    matrix._position = (0, 0)
+    benchmark(matrix._scroll_frames, frames)
+    # there are no stats when benchmarks are disabled
+    if benchmark.stats:
+        benchmark.extra_info['fps'] = (
+            len(frames) / benchmark.stats.stats.mean)
+
+
+def test_compile_messages(benchmark, matrix):
+    messages = [_Message(MESSAGE, scroll=True), _Message("Hi", scroll=False)]
+    benchmark(_compiled, matrix, messages)
+
+
+def test_message_metrics_cached(benchmark):
+    message = _Message(MESSAGE, scroll=False)
+    benchmark(lambda: (message.length, message.height))
+
+
+def test_message_metrics_uncached(benchmark):
+    message = _Message(MESSAGE, scroll=False)
+
+    def measure():
+        atlas.text_size.cache_clear()
+        return message.length, message.height
+
+    benchmark(measure)
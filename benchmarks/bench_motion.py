@@ -0,0 +1,43 @@
+"""
+Benchmarks for planning and compiling stage moves
+"""
+from time import process_time
+
+from sleepcounter.hardware_a.mocks import FakeGpioSink
+from sleepcounter.hardware_a.motion.planner import MotionPlanner
+from sleepcounter.hardware_a.motion.waveform import Waveform, WaveformPlayer
+
+RACK_STEPS = 4400
+
+
+def test_iterate_move(benchmark):
+    move = MotionPlanner().plan(0, RACK_STEPS)
+    benchmark(lambda: list(move))
+
+
+def test_compile_waveform(benchmark):
+    move = MotionPlanner().plan(0, RACK_STEPS)
+    benchmark(Waveform.compile, move)
+
+
+def test_play_waveform_step(benchmark):
+    # a fast move so that the time is spent writing steps, not waiting
+    move = MotionPlanner(max_speed=1e6, acceleration=1e9).plan(0, 1000)
+    player = WaveformPlayer(FakeGpioSink())
+    benchmark(player.play, Waveform.compile(move))
+
+
+def test_play_waveform_real_speed(benchmark):
+    # a move at the stage's own speed, so this includes the time spent waiting
+    # for each step; the CPU used per step shows what that waiting costs
+    waveform = Waveform.compile(MotionPlanner().plan(0, 200))
+    player = WaveformPlayer(FakeGpioSink())
+    cpu = []
+
+    def play():
+        start = process_time()
+        player.play(waveform)
+        cpu.append(process_time() - start)
+
+    benchmark.pedantic(play, rounds=3)
+    benchmark.extra_info['cpu_per_step'] = min(cpu) / len(waveform)
@@ -0,0 +1,53 @@
+"""
+Benchmarks for recording and recovering the stage widget's recovery data
+"""
+# pylint: disable=redefined-outer-name
+import os
+import tempfile
+
+import pytest
+
+from sleepcounter.core.time.calendar import Calendar
+from sleepcounter.core.time.event import Anniversary
+from sleepcounter.hardware_a.widget.stage import RecoveryData, RecoveryJournal
+
+CHRISTMAS = Anniversary(name='Christmas', month=12, day=25)
+CALENDAR = Calendar([CHRISTMAS])
+
+
+@pytest.fixture
+def recovery_file():
+    with tempfile.TemporaryDirectory() as directory:
+        yield os.path.join(directory, 'recovery')
+
+
+def _positions():
+    position = 0
+    while True:
+        position += 1
+        yield (1000, CHRISTMAS, position % 100)
+
+
+def test_recovery_data_record(benchmark, recovery_file):
+    recovery = RecoveryData(recovery_file)
+    data = _positions()
+    benchmark(lambda: recovery.record(next(data)))
+
+
+def test_recovery_data_recover(benchmark, recovery_file):
+    recovery = RecoveryData(recovery_file)
+    recovery.record((1000, CHRISTMAS, 50))
+    benchmark(recovery.recover)
+
+
+def test_recovery_journal_record(benchmark, recovery_file):
+    recovery = RecoveryJournal(recovery_file, CALENDAR)
+    data = _positions()
+    benchmark(lambda: recovery.record(next(data)))
+    recovery.flush()
+
+
+def test_recovery_journal_recover(benchmark, recovery_file):
+    recovery = RecoveryJournal(recovery_file, CALENDAR)
+    recovery.record((1000, CHRISTMAS, 50))
+    benchmark(recovery.recover)
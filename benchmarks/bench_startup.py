@@ -0,0 +1,44 @@
+"""
+Startup time benchmarks. These measure how long it takes before the first
+pixel can be drawn: importing the entry point module and bringing up the led
+matrix from cold.
+"""
+import subprocess
+import sys
+
+from luma.core.interface.serial import noop
+from luma.led_matrix.device import max7219
+
+from sleepcounter.hardware_a.display.display import LedMatrix, _Message
+from sleepcounter.hardware_a.fonts import atlas, library
+
+MESSAGE = "Christmas in 2 sleeps . . . "
+
+
+def _import_entry_point():
+    subprocess.run(
+        [sys.executable, "-c", "import sleepcounter.hardware_a.__main__"],
+        check=True)
+
+
+def _first_pixel():
+    # forget any fonts and text that have been loaded already
+    library.available_fonts.cache_clear()
+    atlas.get_atlas.cache_clear()
+    atlas.text_size.cache_clear()
+    atlas.render_text.cache_clear()
+    device = max7219(noop(), cascaded=4, block_orientation=-90, rotate=2)
+    matrix = LedMatrix(device)
+    # pylint: disable=protected-access
+    message = _Message(MESSAGE, scroll=False)
+    matrix._to_display = [message]
+    matrix._compile([message.key(matrix.device)], {})
+    matrix._show_frame(matrix._frames[0][0])
+
+
+def test_import_entry_point(benchmark):
+    benchmark.pedantic(_import_entry_point, rounds=5)
+
+
+def test_boot_to_first_pixel(benchmark):
+    benchmark(_first_pixel)
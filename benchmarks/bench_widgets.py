@@ -0,0 +1,90 @@
+"""
+Benchmarks for updating the widgets with mock hardware
+"""
+# pylint: disable=redefined-outer-name
+import datetime
+import os
+import tempfile
+from unittest.mock import Mock
+
+import pytest
+
+from sleepcounter.core.mocks import mock_datetime
+from sleepcounter.core.time.calendar import Calendar
+from sleepcounter.core.time.event import Anniversary
+from sleepcounter.hardware_a.display.display import LedMatrix
+from sleepcounter.hardware_a.mocks import MockStage
+from sleepcounter.hardware_a.widget.display import LedMatrixWidget
+from sleepcounter.hardware_a.widget.sleeps import SleepsCache
+from sleepcounter.hardware_a.widget.stage import SleepsStageWidget
+
+TODAY = datetime.datetime(year=2018, month=12, day=3, hour=12, minute=10)
+
+
+def _make_calendar(n_events):
+    start = datetime.date(year=2019, month=1, day=1)
+    events = []
+    for index in range(n_events):
+        date = start + datetime.timedelta(days=index % 365)
+        events.append(Anniversary(
+            name="Event {}".format(index), month=date.month, day=date.day))
+    return Calendar(events)
+
+
+@pytest.mark.parametrize('n_events', [1, 10, 100, 1000])
+def test_led_matrix_widget_update(benchmark, n_events):
+    widget = LedMatrixWidget(Mock(), _make_calendar(n_events))
+
+    def update():
+        # forget the messages shown so that every update shows them
+        widget._messages = None # pylint: disable=protected-access
+        widget.update()
+
+    with mock_datetime(target=TODAY):
+        benchmark(update)
+
+
+@pytest.mark.parametrize('n_events', [10, 1000])
+def test_led_matrix_widget_update_unchanged(benchmark, n_events):
+    widget = LedMatrixWidget(Mock(), _make_calendar(n_events))
+    with mock_datetime(target=TODAY):
+        widget.update()
+        benchmark(widget.update)
+
+
+@pytest.mark.parametrize('n_events', [10, 1000])
+def test_sleeps_cache_rebuild(benchmark, n_events):
+    cache = SleepsCache(_make_calendar(n_events))
+
+    def rebuild():
+        cache.invalidate()
+        return cache.next_events(3)
+
+    with mock_datetime(target=TODAY):
+        benchmark(rebuild)
+
+
+def test_led_matrix_message_change(benchmark, device):
+    matrix = LedMatrix(device)
+    messages = ["Christmas in {} sleeps . . . ".format(n) for n in range(3)]
+    matrix.show_messages(messages)
+
+    def change():
+        messages[0] = messages[0][1:] + messages[0][0]
+        matrix.show_messages(messages)
+
+    benchmark(change)
+    matrix.clear()
+
+
+@pytest.fixture
+def recovery_file():
+    with tempfile.TemporaryDirectory() as directory:
+        yield os.path.join(directory, 'recovery')
+
+
+def test_stage_widget_update(benchmark, recovery_file):
+    widget = SleepsStageWidget(
+        MockStage(), _make_calendar(10), recovery_file=recovery_file)
+    with mock_datetime(target=TODAY):
+        benchmark(widget.update)
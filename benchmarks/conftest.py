@@ -0,0 +1,10 @@
+"""Fixtures shared by the benchmarks"""
+import pytest
+
+from sleepcounter.hardware_a.mocks import Matrix
+
+
+@pytest.fixture
+def device():
+    """An emulated led matrix set up like the real display"""
+    return Matrix()
@@ -7,6 +7,7 @@ setuptools.setup(
     install_requires=[
         # third-party...
         'max7219',
+        'numpy',
         'stage>=0.3.0',
         # project specific...
         'sleepcounter-core',
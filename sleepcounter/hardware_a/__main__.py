@@ -1,52 +1,155 @@
 """
 Main entry-point module for the sleepcounter. All instances are created here
-and the application is started.
+and the application is started. Hardware is only set up when main is called so
+that this module can be imported without it.
+
+The stage is homed when its widget is created, which takes a long time on a
+long rack. So the widgets are booted together: the stage widget is created in
+another thread while the display comes up and shows the calendar, and the
+application is only started once the stage is ready.
 """
+import argparse
+import asyncio
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from sys import stdout
 from time import sleep
 
 from stage.stage import Stage
 from stage.factory.config import Configurator
-from stage.factory.rpi import RPiMonopolarStepperStageFactory
 
 from sleepcounter.core.application import Application
 # FIXME: The diary is a configuration detail and should not be part of the
 #        package. It should be passed as a path when starting the app.
 from sleepcounter.core.diary import CUSTOM_DIARY
-from sleepcounter.hardware_a.display.display import LedMatrix
-from sleepcounter.hardware_a.display.factory import DISPLAY
+from sleepcounter.hardware_a.display.display import (
+    DEFAULT_FRAME_FILE,
+    LedMatrix)
+from sleepcounter.hardware_a.display.factory import get_display
+from sleepcounter.hardware_a.display.process import ProcessLedMatrix
+from sleepcounter.hardware_a.display.renderer import AsyncLedMatrix
+from sleepcounter.hardware_a.motion.calibration import CalibratedStage
+from sleepcounter.hardware_a.motion.executor import (
+    AsyncMotionExecutor,
+    MotionExecutor)
+from sleepcounter.hardware_a.motion.waveform import GpioSink, WaveformExecutor
+from sleepcounter.hardware_a.runtime import AsyncApplication
 from sleepcounter.hardware_a.widget.display import LedMatrixWidget
 from sleepcounter.hardware_a.widget.stage import SleepsStageWidget
 
-logging.basicConfig(
-    format='%(asctime)s[%(name)s]:%(levelname)s:%(message)s',
-    stream=stdout,
-    level=logging.INFO)
+MOTOR_PINS = (
+    26, # a1 orange
+    19, # b1 yellow
+    13, # a2 pink
+    6,  # b2 blue
+)
 
 CONFIG = Configurator(
-    motor_pins=(
-        26, # a1 orange
-        19, # b1 yellow
-        13, # a2 pink
-        6,  # b2 blue
-    ),
+    motor_pins=MOTOR_PINS,
     end_stop_pin=22,
     end_stop_active_low=True,
     maximum_position=4400,
     minimum_position=0)
-STAGE = Stage(RPiMonopolarStepperStageFactory(CONFIG))
+
+LOGGER = logging.getLogger("main")
+
+
+def create_stage():
+    """
+    Creates the stage, setting up the GPIO pins in CONFIG. The stage is wrapped
+    so that it can be calibrated, letting the widget resume from the position
+    it recorded and the waveform executor say where each move left it.
+    """
+    # pylint: disable=import-outside-toplevel
+    # The RPi factory imports the GPIO library which is only available on the
+    # Pi so it is imported here rather than when this module is imported.
+    from stage.factory.rpi import RPiMonopolarStepperStageFactory
+    return CalibratedStage.wrap(Stage(RPiMonopolarStepperStageFactory(CONFIG)))
+
+
+def create_sink():
+    """
+    Creates the sink that waveforms are played into, driving the motor pins.
+    The stage must be created first so that the GPIO mode has been set.
+    """
+    # pylint: disable=import-outside-toplevel
+    from RPi import GPIO
+    return GpioSink(GPIO, MOTOR_PINS)
 
 
-def main():
+def parse_args(argv=None):
+    """Parses the command line arguments"""
+    parser = argparse.ArgumentParser(prog='sleepcounter.hardware_a')
+    parser.add_argument(
+        '--asyncio',
+        action='store_true',
+        help="run the widgets on one asyncio event loop instead of threads")
+    parser.add_argument(
+        '--waveform',
+        action='store_true',
+        help="move the stage by playing back precomputed step waveforms")
+    parser.add_argument(
+        '--render-process',
+        action='store_true',
+        help="render and drive the display from a separate process")
+    args = parser.parse_args(argv)
+    if args.asyncio and args.waveform:
+        parser.error("--waveform can't be used with --asyncio")
+    if args.asyncio and args.render_process:
+        # requests to the render process block until they are answered
+        parser.error("--render-process can't be used with --asyncio")
+    return args
+
+
+def main(argv=None):
     """Application main function. Instantiates some widgets and runs the app"""
-    display_widget = LedMatrixWidget(
-        display=LedMatrix(DISPLAY),
-        calendar=CUSTOM_DIARY)
-    stage_widget = SleepsStageWidget(
-        stage=STAGE,
-        calendar=CUSTOM_DIARY)
-    app = Application(widgets=[display_widget, stage_widget])
+    args = parse_args(argv)
+    logging.basicConfig(
+        format='%(asctime)s[%(name)s]:%(levelname)s:%(message)s',
+        stream=stdout,
+        level=logging.INFO)
+    if args.asyncio:
+        _run_async()
+    else:
+        _run_threaded(args.waveform, args.render_process)
+
+
+def boot(make_display_widget, make_stage_widget):
+    """
+    Creates the display and stage widgets at the same time. The display widget
+    is updated as soon as it is made so that it shows the calendar while the
+    stage homes. Returns the widgets once both are ready.
+    """
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        stage_widget = pool.submit(make_stage_widget)
+        display_widget = make_display_widget()
+        display_widget.update()
+        LOGGER.info("Display ready. Waiting for stage")
+        return [display_widget, stage_widget.result()]
+
+
+async def boot_async(make_display_widget, make_stage_widget):
+    """
+    Coroutine that boots the widgets like boot, making the stage widget in
+    another thread so that the display can be driven by the event loop while
+    the stage homes
+    """
+    loop = asyncio.get_running_loop()
+    stage_widget = loop.run_in_executor(None, make_stage_widget)
+    display_widget = make_display_widget()
+    await display_widget.update_async()
+    LOGGER.info("Display ready. Waiting for stage")
+    return [display_widget, await stage_widget]
+
+
+def _run_threaded(waveform=False, render_process=False):
+    widgets = boot(
+        lambda: LedMatrixWidget(
+            display=_create_display(LedMatrix, render_process),
+            calendar=CUSTOM_DIARY),
+        lambda: _create_stage_widget(waveform))
+    app = Application(widgets=widgets)
     app.start()
     while True:
         try:
@@ -55,5 +158,44 @@ def main():
             app.stop()
             break
 
+
+def _run_async():
+    try:
+        asyncio.run(_boot_and_run_async())
+    except KeyboardInterrupt:
+        pass
+
+
+def _create_display(led_matrix, render_process):
+    if render_process:
+        # the child process opens the SPI bus itself
+        return ProcessLedMatrix(get_display, frame_file=DEFAULT_FRAME_FILE)
+    return led_matrix(get_display(), frame_file=DEFAULT_FRAME_FILE)
+
+
+def _create_stage_widget(waveform):
+    stage = create_stage()
+    executor = MotionExecutor
+    if waveform and not hasattr(stage, 'calibrate'):
+        LOGGER.warning("Stage can't be calibrated. Not playing waveforms")
+    elif waveform:
+        executor = partial(WaveformExecutor, sink=create_sink())
+    return SleepsStageWidget(
+        stage=stage,
+        calendar=CUSTOM_DIARY,
+        executor=executor)
+
+
+async def _boot_and_run_async():
+    widgets = await boot_async(
+        lambda: LedMatrixWidget(
+            display=_create_display(AsyncLedMatrix, render_process=False),
+            calendar=CUSTOM_DIARY),
+        lambda: SleepsStageWidget(
+            stage=create_stage(),
+            calendar=CUSTOM_DIARY,
+            executor=AsyncMotionExecutor))
+    await AsyncApplication(widgets=widgets).run()
+
 if __name__ == "__main__":
     main()
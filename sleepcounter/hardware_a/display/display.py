@@ -3,44 +3,112 @@ Led matrix interface implementation which extends the abstract base class and
 makes calls to the driver simpler.
 """
 from logging import getLogger
-from threading import Event, Thread
-from time import sleep
-from PIL import ImageFont
+from threading import Condition, Event, Thread, current_thread
+
+import numpy as np
+from PIL import Image
 
-from luma.core.render import canvas
-from luma.core.virtual import viewport
 from luma.led_matrix.device import max7219
 
+from sleepcounter.hardware_a.display.framediff import FrameDiffDevice
+from sleepcounter.hardware_a.display.framefile import FrameFile, make_key
 from sleepcounter.hardware_a.display.interface import LedMatrixInterface
-from sleepcounter.hardware_a.fonts.library import AVAILABLE_FONTS
+from sleepcounter.hardware_a.display.packing import N_DIGITS
+from sleepcounter.hardware_a.display.playlist import Item, Playlist
+from sleepcounter.hardware_a.display.scheduler import FrameScheduler
+from sleepcounter.hardware_a.fonts import atlas
 
 SCROLL_RATE = 40 # pixels per second
+DWELL_TIME = 3 # seconds a static message is shown before the next
 VERTICAL_OFFSET = 0
+DEFAULT_FRAME_FILE = '/var/tmp/sleepcounter.frames'
 
 _LOGGER = getLogger("led matrix")
 
 
 class LedMatrix(LedMatrixInterface):
     """Led matrix implementation - an interface to the luma core library"""
-    def __init__(self, device: max7219):
-        """Creates the interface from a MAX7219 device instance"""
+    # pylint: disable=too-many-instance-attributes
+    def __init__(
+            self,
+            device: max7219,
+            scroll_rate=SCROLL_RATE,
+            dwell=DWELL_TIME,
+            frame_file=None):
+        """
+        Creates the interface from a MAX7219 device instance. Messages are
+        scrolled at scroll_rate pixels per second and static messages are shown
+        for dwell seconds when there are other messages to show. Messages are
+        compiled into frames held in frame_file, which is reused if the same
+        messages are shown again, or in memory if no file is given.
+        """
         _LOGGER.info(
             "Instantiated LED matrix device %r with unit %r ",
             self, device)
-        self.device = device
-        self.virtual = viewport(device, width=200, height=100)
-        self._to_display = []
+        self.device = FrameDiffDevice(device)
         self._worker = _DeviceThreadManager(self._activity)
+        # waits between frames are cut short when the worker is stopped
+        self._scheduler = FrameScheduler(scroll_rate, wait=self._worker.wait)
+        self.dwell = dwell
+        self.frame_file = frame_file
+        self._frames = None
+        self._to_display = []
+        self._schedule = Playlist()
+        self._entries = []
+        # the message and frame the worker has got to, if it is part way
+        # through showing a message
+        self._position = None
+
+    @property
+    def scroll_rate(self):
+        """
+        Returns the rate that messages are scrolled in pixels per second
+        """
+        return self._scheduler.rate
+
+    @property
+    def statistics(self):
+        """
+        Returns the measured frame statistics for scrolled messages
+        """
+        return self._scheduler.statistics
 
-    def show_messages(self, messages: list, scroll=False):
+    def show_messages(self, messages: list, scroll=False, dwell=None):
         """
         Shows messages from a list. If a message fits the display, it will be
         shown static. If it's too long, it will be scrolled across the display.
-        Scrolling may be forced optionally with the scroll arg.
+        Scrolling may be forced optionally with the scroll arg. Static messages
+        are shown for dwell seconds, or the instance's dwell time if not given.
+
+        Messages may be given as text or as playlist Items to set a message's
+        priority, dwell, repeat count and expiry. The message with the highest
+        priority is always shown next and messages of the same priority take
+        turns.
+
+        Messages already being shown are not rendered again. The new messages
+        are spliced into the playlist without clearing the display, carrying on
+        from the message being shown if it has not changed and nothing more
+        important has been added.
         """
-        self.clear()
-        self._to_display = [_Message(text, scroll) for text in messages]
+        if dwell is None:
+            dwell = self.dwell
+        items = [
+            message if isinstance(message, Item) else Item(message)
+            for message in messages]
+        self._worker.stop()
+        shown = [message.key(self.device) for message in self._to_display]
+        self._to_display = [
+            _Message(item.text, scroll, _default(item.dwell, dwell))
+            for item in items]
         _LOGGER.info("Showing messages...{}".format(self._to_display))
+        keys = [message.key(self.device) for message in self._to_display]
+        self._compile(keys, dict(zip(shown, self._sequences())))
+        self._schedule = Playlist()
+        self._entries = [
+            self._schedule.add(
+                index, item.priority, item.repeat, item.expires_in)
+            for index, item in enumerate(items)]
+        self._resume(shown, keys)
         self._worker.start()
 
     def clear(self):
@@ -51,47 +119,155 @@ class LedMatrix(LedMatrixInterface):
         self._worker.stop()
         self.device.clear()
         self._to_display = []
+        self._schedule = Playlist()
+        self._entries = []
+        self._position = None
 
     def _activity(self):
         """
         The display's worker activity that should be executed asynchronously.
+        A lone static message is drawn once and the worker then blocks until it
+        is stopped or the message expires since there is nothing else to draw.
+        Once every message has expired or been repeated the display is cleared.
         """
-        for message in self._to_display:
-            if message.is_scrolling(self.device):
-                _LOGGER.info("Scrolling message <%s>...", message.text)
-                self._scroll_text(message)
+        if not self._to_display:
+            self._worker.wait()
+            return
+        for frames, first, dwell in self._playlist():
+            if len(frames) > 1:
+                self._scroll_frames(frames, first)
             else:
+                self._show_frame(frames[0])
+                self._worker.wait(dwell)
+        if not self._worker.stopping:
+            _LOGGER.info("Playlist finished")
+            self.device.clear()
+            self._worker.wait()
+
+    def _playlist(self):
+        """
+        Generates the frames of each message chosen from the playlist, until
+        the worker is stopped or there is nothing left to show. Each has the
+        frame to start from and the time in seconds to show a static message
+        for. The time is None if the message should be shown until the worker
+        is stopped.
+        """
+        resume = self._position
+        while not self._worker.stopping:
+            entry = self._next_entry(resume)
+            if entry is None:
+                return
+            index = entry.key
+            first = resume[1] if resume and resume[0] == index else 0
+            resume = None
+            self._position = (index, first)
+            message = self._to_display[index]
+            frames = self._frames[index]
+            if len(frames) > 1:
+                _LOGGER.info("Scrolling message <%s>...", message.text)
+                yield frames, first, 0
+            elif len(self._schedule) == 1 and entry.repeat is None:
                 _LOGGER.info("Showing static message <%s>...", message.text)
-                self._show_text(message)
+                yield frames, 0, self._schedule.time_left(entry)
+            else:
+                _LOGGER.info(
+                    "Showing static message <%s> for %ss...",
+                    message.text,
+                    message.dwell)
+                yield frames, 0, message.dwell
+            if self._worker.stopping:
+                # stay at the message that was interrupted
+                return
+            self._position = None
 
-    def _show_text(self, message, offset=0):
-        _LOGGER.debug(
-            "Showing: <text:%s><offset:%d>", message.text, offset)
-        with canvas(self.virtual) as draw:
-            draw.text(
-                (offset, VERTICAL_OFFSET),
-                message.text,
-                font=_Message.FONT,
-                fill="white",
-            )
+    def _next_entry(self, resume):
+        """
+        Returns the playlist entry to show next. An interrupted message is
+        carried on with unless there is a more important message to show.
+        """
+        if resume is not None:
+            entry = self._entries[resume[0]]
+            top = self._schedule.peek()
+            if top is not None and entry.priority >= top.priority:
+                # counted as shown so that it takes its turn only once
+                taken = self._schedule.take(entry)
+                if taken is not None:
+                    return taken
+        return self._schedule.next()
+
+    def _sequences(self):
+        if self._frames is None:
+            return []
+        return [self._frames[index] for index in range(len(self._frames))]
+
+    def _resume(self, shown, keys):
+        """
+        Sets the position the worker carries on from after the playlist has
+        changed. A message that is still shown carries on from the frame it
+        had got to and a changed message starts from its first frame.
+        """
+        if self._position is None:
+            return
+        index, _ = self._position
+        if index >= len(keys):
+            self._position = None
+        elif index >= len(shown) or shown[index] != keys[index]:
+            self._position = (index, 0)
+
+    def _compile(self, keys, compiled):
+        """
+        Maps the frames for the messages being shown, compiling them into the
+        frame file unless it already holds them. Frames already compiled for
+        a message are copied rather than rendered again.
+        """
+        previous = self._frames
+        self._frames = None
+        if self._to_display:
+            packer = self.device.packer
+            key = make_key(packer.layout, *keys)
+            frame_shape = (N_DIGITS, 2 * packer.cascaded)
+            self._frames = FrameFile.load(self.frame_file, key, frame_shape)
+            if self._frames is None:
+                self._frames = FrameFile.compile(
+                    self.frame_file, key, self._render(keys, compiled))
+        # the previous frames can only be unmapped once nothing refers to them
+        compiled.clear()
+        if previous is not None:
+            previous.close()
 
-    def _scroll_text(self, message):
-        for offset in range(message.length + self.device.width):
-            self._show_text(message, (self.device.width - offset))
-            sleep(1 / SCROLL_RATE)
+    def _render(self, keys, compiled):
+        for message, key in zip(self._to_display, keys):
+            if key not in compiled:
+                _LOGGER.info("Rendering frames for %r", message)
+                compiled[key] = message.frames(self.device)
+            yield compiled[key]
+
+    def _show_frame(self, frame):
+        # the register values are every other byte of the transactions
+        self.device.display_registers(frame[:, 1::2], frame)
+
+    def _scroll_frames(self, frames, first=0):
+        index, _ = self._position
+        for offset in self._scheduler.frames(len(frames) - first):
+            if self._worker.stopping:
+                return
+            self._position = (index, first + offset)
+            self._show_frame(frames[first + offset])
 
 
 class _Message:
-    FONT_PATH = AVAILABLE_FONTS['Vera.ttf']
+    FONT_NAME = 'Vera.ttf'
     FONT_SIZE = 9
-    FONT = ImageFont.truetype(font=FONT_PATH, size=FONT_SIZE)
 
-    def __init__(self, text: str, scroll: bool):
+    def __init__(self, text: str, scroll: bool, dwell=DWELL_TIME):
         """
-        Builds a message to display on the device from text
+        Builds a message to display on the device from text. If the message is
+        static it will be shown for dwell seconds.
         """
         self._text = text.upper()
         self._scroll = scroll
+        self.dwell = dwell
+        self._strip = None
 
     @property
     def text(self):
@@ -105,7 +281,7 @@ class _Message:
         """
         Returns the length of the message in pixels
         """
-        length, _ = self.__class__.FONT.getsize(self.text)
+        length, _ = self._size
         return length
 
     @property
@@ -113,9 +289,75 @@ class _Message:
         """
         Returns the height of the message in pixels
         """
-        _, height = self.__class__.FONT.getsize(self.text)
+        _, height = self._size
         return height
 
+    @property
+    def bitmap(self):
+        """
+        Returns a 1-bit bitmap of the text. The bitmap is shared with the font
+        cache so it must not be modified.
+        """
+        cls = self.__class__
+        return atlas.render_text(cls.FONT_NAME, cls.FONT_SIZE, self.text)
+
+    @property
+    def _size(self):
+        cls = self.__class__
+        return atlas.text_size(cls.FONT_NAME, cls.FONT_SIZE, self.text)
+
+    def strip(self, device):
+        """
+        Returns the message rasterised into a 1-bit image strip. The strip is
+        one device width of blank columns followed by the text so that every
+        frame of a scroll is a device sized window cropped from it. The strip
+        is rendered once and cached for the lifetime of the message.
+        """
+        size = (self.length + device.width, device.height)
+        if self._strip is None or self._strip.size != size:
+            strip = Image.new(device.mode, size)
+            strip.paste(self.bitmap, (device.width, VERTICAL_OFFSET))
+            self._strip = strip
+        return self._strip
+
+    def window(self, device, start):
+        """
+        Returns the device sized frame starting at column start of the strip.
+        Columns beyond the end of the strip are blank.
+        """
+        strip = self.strip(device)
+        return strip.crop((start, 0, start + device.width, device.height))
+
+    def frames(self, device):
+        """
+        Returns the transactions for every frame of the message using the
+        packer of the device's frame diff layer. A scrolling message has one
+        frame per column of the scroll and a static message has one frame.
+        """
+        packer = device.packer
+        if self.is_scrolling(device):
+            n_frames = self.length + device.width
+            registers = packer.pack_strip(self.strip(device), range(n_frames))
+        else:
+            frame = self.window(device, device.width)
+            registers = packer.pack(frame)[np.newaxis]
+        return packer.transactions(registers)
+
+    def key(self, device):
+        """
+        Returns bytes identifying the frames of the message without rendering
+        it
+        """
+        cls = self.__class__
+        return repr((
+            cls.FONT_NAME,
+            cls.FONT_SIZE,
+            VERTICAL_OFFSET,
+            self._scroll,
+            device.width,
+            device.height,
+            self.text)).encode()
+
     def is_scrolling(self, device):
         return self._scroll or (self.length > device.width)
 
@@ -126,39 +368,80 @@ class _Message:
         return self.text
 
 
-class _DeviceThreadManager:
+def _default(value, default):
+    return default if value is None else value
 
+
+class _DeviceThreadManager:
+    """
+    Runs the device's activity in one long lived thread. Starting hands the
+    thread new content rather than creating another thread. Stopping
+    interrupts the activity at its next check of stopping or wait, which the
+    activity makes between frames, and returns once it has let go of the
+    device. So switching content takes at most one frame.
+    """
     def __init__(self, target):
         """
         Manages the device's thread of activity
         """
         self._target = target
-        self._active = Event()
+        self._condition = Condition()
+        self._wake = Event()
+        self._active = False
+        self._busy = False
         self._thread = None
 
     def start(self):
         """
-        Start the thread of activity
+        Start the thread of activity, interrupting the activity for any content
+        it was showing. The content must not be changed while the activity is
+        running, so stop should be called before changing it.
         """
-        if self._active:
-            _LOGGER.debug("Already active")
-            self.stop()
-        _LOGGER.debug("Restarting thread...")
-        self._thread = Thread(
-            target=self._activity,
-            daemon=True)
-        self._thread.start()
+        with self._condition:
+            _LOGGER.debug("Starting activity...")
+            self._active = True
+            self._wake.set()
+            self._condition.notify_all()
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = Thread(target=self._activity, daemon=True)
+                self._thread.start()
 
     def stop(self):
         """
-        Stop the thread of activity
+        Stop the thread of activity, waiting for it to finish the frame it is
+        drawing. The thread is kept to be started again.
+        """
+        with self._condition:
+            _LOGGER.debug("Stopping activity")
+            self._active = False
+            self._wake.set()
+            if current_thread() is not self._thread:
+                self._condition.wait_for(lambda: not self._busy)
+
+    @property
+    def stopping(self):
+        """
+        Returns True if the thread of activity has been asked to stop
+        """
+        return self._wake.is_set()
+
+    def wait(self, timeout=None):
+        """
+        Blocks the thread of activity for timeout seconds or indefinitely if no
+        timeout is given. Returns early with True if a stop is requested.
         """
-        if self._thread:
-            _LOGGER.debug("Tearing down thread")
-            self._active.clear()
-            self._thread.join()
+        return self._wake.wait(timeout)
 
     def _activity(self):
-        self._active.set()
-        while self._active.is_set():
-            self._target()
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._active)
+                self._wake.clear()
+                self._busy = True
+            try:
+                while not self.stopping:
+                    self._target()
+            finally:
+                with self._condition:
+                    self._busy = False
+                    self._condition.notify_all()
@@ -0,0 +1,159 @@
+"""
+An in-process emulation of a cascaded MAX7219 led matrix so that the rendering
+path can be run, profiled and tested without the hardware. The emulated device
+is the luma max7219 device connected to an emulated SPI bus. Register writes on
+the bus are decoded into a framebuffer which can be saved as a PNG or, for a
+recorded sequence of frames, an animated GIF.
+
+The bus can't tell where one frame ends and the next begins, since the frame
+diff layer only writes the digits that change. So the device is told instead:
+end_frame is called once a frame has been written, by display and by the
+frame diff layer.
+"""
+from logging import getLogger
+
+import numpy as np
+from PIL import Image
+
+from luma.led_matrix.device import max7219
+
+from sleepcounter.hardware_a.display.packing import N_DIGITS, map_pixels
+
+_LOGGER = getLogger("emulator")
+
+# MAX7219 register addresses from the datasheet
+NOOP = 0x00
+DIGIT_0 = 0x01
+INTENSITY = 0x0A
+SHUTDOWN = 0x0C
+SCALE = 8 # size of an led in pixels when saving images
+
+
+class EmulatedSpi:
+    """
+    An SPI bus with a cascade of MAX7219 units on it. It has the interface of
+    a luma serial interface and counts the bytes sent in each transaction.
+    """
+    def __init__(self, cascaded: int):
+        self.cascaded = cascaded
+        self.registers = np.zeros((cascaded, N_DIGITS), dtype=np.uint8)
+        self.intensity = np.zeros(cascaded, dtype=np.uint8)
+        self.powered = np.zeros(cascaded, dtype=bool)
+        self.transactions = 0
+        self.bytes_sent = 0
+        self.last_transaction_size = 0
+
+    @property
+    def bytes_per_transaction(self):
+        """Returns the mean number of bytes sent in each transaction"""
+        if not self.transactions:
+            return 0.0
+        return self.bytes_sent / self.transactions
+
+    def reset_counters(self):
+        """Resets the transaction and byte counters"""
+        self.transactions = 0
+        self.bytes_sent = 0
+        self.last_transaction_size = 0
+
+    def command(self, *cmd):
+        """Sends a command. The MAX7219 has none so this sends data"""
+        self.data(cmd)
+
+    def data(self, data):
+        """
+        Sends one transaction of (register, value) pairs, one for each unit in
+        the cascade
+        """
+        data = list(data)
+        self.transactions += 1
+        self.bytes_sent += len(data)
+        self.last_transaction_size = len(data)
+        pairs = list(zip(data[0::2], data[1::2]))
+        for unit, (register, value) in enumerate(pairs[:self.cascaded]):
+            if DIGIT_0 <= register < DIGIT_0 + N_DIGITS:
+                self.registers[unit, register - DIGIT_0] = value
+            elif register == INTENSITY:
+                self.intensity[unit] = value
+            elif register == SHUTDOWN:
+                self.powered[unit] = bool(value)
+
+    def cleanup(self):
+        """Releases the bus"""
+
+
+class EmulatedMax7219(max7219):
+    """
+    A luma max7219 device on an emulated SPI bus. The framebuffer holds the
+    pixels as they would be shown, undoing the rotation and block orientation
+    applied by the device. Frames can be recorded as they are completed.
+    """
+    def __init__(self, cascaded=4, block_orientation=0, rotate=0, **kwargs):
+        self.spi = EmulatedSpi(cascaded)
+        self.frames = []
+        self.recording = False
+        super().__init__(
+            self.spi,
+            cascaded=cascaded,
+            block_orientation=block_orientation,
+            rotate=rotate,
+            **kwargs)
+        self._pixels = map_pixels(self)
+        _LOGGER.info("Created emulated led matrix device %r", self)
+
+    @property
+    def framebuffer(self):
+        """Returns the pixels currently shown as a height x width bool array"""
+        # digits x units x bits like the pixel map
+        bits = np.unpackbits(
+            self.spi.registers.T[..., np.newaxis], axis=-1, bitorder='little')
+        framebuffer = np.zeros(self.width * self.height, dtype=bool)
+        framebuffer[self._pixels] = bits
+        return framebuffer.reshape(self.height, self.width)
+
+    def display(self, image):
+        """Shows the image, ending the frame once it has been written"""
+        super().display(image)
+        self.end_frame()
+
+    def end_frame(self):
+        """
+        Marks the end of a frame written to the bus, recording it if frames
+        are being recorded
+        """
+        if self.recording:
+            self.capture()
+
+    def snapshot(self):
+        """Returns the pixels currently shown as an image"""
+        return Image.fromarray(self.framebuffer)
+
+    def capture(self):
+        """Records the pixels currently shown as a frame"""
+        self.frames.append(self.snapshot())
+
+    def save_png(self, path, scale=SCALE):
+        """Saves the pixels currently shown to a PNG file"""
+        _enlarge(self.snapshot(), scale).save(path, format='PNG')
+
+    def save_gif(self, path, frame_duration=25, scale=SCALE):
+        """
+        Saves the recorded frames to an animated GIF showing each frame for
+        frame_duration milliseconds
+        """
+        if not self.frames:
+            raise ValueError("No frames have been recorded")
+        frames = [_enlarge(frame, scale) for frame in self.frames]
+        frames[0].save(
+            path,
+            format='GIF',
+            save_all=True,
+            append_images=frames[1:],
+            duration=frame_duration,
+            loop=0)
+
+
+def _enlarge(image, scale):
+    image = image.convert('L')
+    return image.resize(
+        (image.width * scale, image.height * scale), Image.NEAREST)
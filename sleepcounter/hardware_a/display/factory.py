@@ -1,7 +1,18 @@
-"""The max7219 display instance is created here as DISPLAY"""
+"""
+The max7219 display instance is created here by get_display. The SPI bus is
+only opened when the display is first requested so that this module can be
+imported without the hardware present.
+"""
+from functools import lru_cache
+
 from luma.core.interface.serial import spi, noop
 from luma.led_matrix.device import max7219
 
-SERIAL = spi(port=0, device=0, gpio=noop())
-DISPLAY = max7219(SERIAL, cascaded=4, block_orientation=-90, rotate=2)
-DISPLAY.contrast(25)
+
+@lru_cache(maxsize=None)
+def get_display():
+    """Returns the max7219 display instance, creating it on the first call"""
+    serial = spi(port=0, device=0, gpio=noop())
+    display = max7219(serial, cascaded=4, block_orientation=-90, rotate=2)
+    display.contrast(25)
+    return display
@@ -0,0 +1,87 @@
+"""
+A frame diffing layer that sits between the led matrix and the luma MAX7219
+device. The registers of the last frame sent to the device are kept so that
+identical frames are not sent again and only the digit registers that have
+changed are written over the SPI bus.
+"""
+from logging import getLogger
+
+import numpy as np
+
+from luma.led_matrix.device import max7219
+
+from sleepcounter.hardware_a.display.packing import N_DIGITS, FramePacker
+
+_LOGGER = getLogger("frame diff")
+
+
+class FrameDiffDevice:
+    """
+    Wraps a luma MAX7219 device and exposes the same interface. Frames passed
+    to display are packed into register values and compared with the frame
+    that was last sent. A digit register is only written when the byte for at
+    least one of the cascaded units has changed.
+
+    A digit is written to every unit in the cascade in one transaction since
+    data for one unit has to be shifted through all of the others anyway. If
+    the device has an end_frame method, as the emulator does, it is called
+    once the digits of each frame have been written.
+    """
+    def __init__(self, device: max7219):
+        """Creates the layer wrapping the MAX7219 device instance"""
+        self._device = device
+        self.packer = FramePacker(device)
+        self._registers = None
+        self._end_frame = getattr(device, 'end_frame', None)
+        self.frames_sent = 0
+        self.frames_skipped = 0
+        self.digits_written = 0
+
+    def __getattr__(self, name):
+        return getattr(self._device, name)
+
+    def display(self, image):
+        """
+        Sends the image to the device writing only the digits that differ from
+        the previous frame
+        """
+        assert image.mode == self._device.mode
+        assert image.size == self._device.size
+        self.display_registers(self.packer.pack(image))
+
+    def display_registers(self, registers, transactions=None):
+        """
+        Sends a frame that has already been packed into registers by the
+        packer. The transactions for the registers may also be given if they
+        have been worked out in advance.
+        """
+        previous = self._registers
+        if previous is not None and np.array_equal(registers, previous):
+            self.frames_skipped += 1
+            return
+        if transactions is None:
+            transactions = self.packer.transactions(registers)
+        for digit in range(N_DIGITS):
+            if previous is None or (registers[digit] != previous[digit]).any():
+                self._write_digit(digit, transactions[digit])
+        self._registers = np.array(registers, dtype=np.uint8)
+        self.frames_sent += 1
+        if self._end_frame is not None:
+            self._end_frame()
+
+    def clear(self):
+        """Clears the device and forgets the last frame sent"""
+        self._device.clear()
+        self.invalidate()
+
+    def invalidate(self):
+        """
+        Forgets the last frame so that the next one is written in full. This
+        should be called if the device may have been written to directly.
+        """
+        self._registers = None
+
+    def _write_digit(self, digit, transaction):
+        _LOGGER.debug("Writing digit %d: %s", digit, transaction)
+        self._device.data(transaction.tolist())
+        self.digits_written += 1
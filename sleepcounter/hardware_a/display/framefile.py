@@ -0,0 +1,154 @@
+"""
+A flat file of frames compiled for the led matrix. Every frame of a playlist of
+messages is packed into the bytes sent to the device ahead of time and written
+to one file which is then memory-mapped. Showing the playlist is just walking
+the mapping, and the frames are views of it so nothing is copied. The file is
+tagged with a key for its contents so that it can be reused after a restart if
+the same playlist is shown again.
+
+A playlist is a list of sequences of frames. A sequence of one frame is shown
+static and longer sequences are scrolled.
+
+module constants:
+MAGIC -- bytes that start every frame file
+VERSION -- the current frame file format version
+"""
+import hashlib
+import mmap
+import struct
+from logging import getLogger
+
+import numpy as np
+
+from sleepcounter.hardware_a.persistence.store import write_atomic
+
+_LOGGER = getLogger("frame file")
+
+MAGIC = b'SLPF'
+VERSION = 1
+# magic, version, bytes per frame, number of sequences, key
+_HEADER = struct.Struct('<4sHHI16s4x')
+# first frame, number of frames
+_INDEX = struct.Struct('<II')
+
+
+def make_key(*parts):
+    """Returns a key for the contents of a frame file made from bytes parts"""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(struct.pack('<I', len(part)))
+        digest.update(part)
+    return digest.digest()[:16]
+
+
+class FrameFile:
+    """
+    A memory-mapped playlist of compiled frames. Indexing returns the frames of
+    a sequence as an array of shape (frames,) + frame_shape which is a view of
+    the mapping.
+    """
+    def __init__(self, mapping, key, frame_shape, index):
+        """Use compile or load to create a frame file"""
+        self.key = key
+        self.frame_shape = tuple(frame_shape)
+        self._map = mapping
+        self._index = index
+
+    @classmethod
+    def compile(cls, path, key, sequences):
+        """
+        Writes the sequences of frames to a frame file at path and maps it. All
+        of the frames must have the same shape. If path is None the frames are
+        held in an anonymous mapping instead.
+        """
+        sequences = [np.asarray(frames, dtype=np.uint8) for frames in sequences]
+        frame_shape = sequences[0].shape[1:]
+        frame_size = int(np.prod(frame_shape))
+        header = _HEADER.pack(MAGIC, VERSION, frame_size, len(sequences), key)
+        index = []
+        first = 0
+        for frames in sequences:
+            if frames.shape[1:] != frame_shape:
+                raise ValueError(
+                    "Frames of shape {} in a file of shape {}".format(
+                        frames.shape[1:], frame_shape))
+            index.append((first, len(frames)))
+            first += len(frames)
+        data = b''.join(
+            [header]
+            + [_INDEX.pack(*entry) for entry in index]
+            + [frames.tobytes() for frames in sequences])
+        if path is None:
+            mapping = mmap.mmap(-1, len(data))
+            mapping.write(data)
+        else:
+            _LOGGER.info("Writing %d frames to %s", first, path)
+            write_atomic(path, data)
+            mapping = _map_file(path)
+        return cls(mapping, key, frame_shape, index)
+
+    @classmethod
+    def load(cls, path, key, frame_shape):
+        """
+        Maps the frame file at path if it holds frames of frame_shape compiled
+        for key. Returns None if there is no such file.
+        """
+        if path is None:
+            return None
+        try:
+            mapping = _map_file(path)
+        except (OSError, ValueError):
+            return None
+        try:
+            index = _read_index(mapping, key, int(np.prod(frame_shape)))
+        except struct.error:
+            index = None
+        if index is None:
+            mapping.close()
+            return None
+        _LOGGER.info("Reusing frames compiled in %s", path)
+        return cls(mapping, key, frame_shape, index)
+
+    def __len__(self):
+        return len(self._index)
+
+    def __getitem__(self, sequence):
+        first, count = self._index[sequence]
+        frame_size = int(np.prod(self.frame_shape))
+        offset = _frames_offset(len(self._index)) + first * frame_size
+        frames = np.frombuffer(
+            self._map, dtype=np.uint8, count=count * frame_size, offset=offset)
+        return frames.reshape((count,) + self.frame_shape)
+
+    def close(self):
+        """
+        Unmaps the file. If frames from the file are still in use the mapping
+        is left to be released when they are no longer referenced.
+        """
+        try:
+            self._map.close()
+        except BufferError:
+            _LOGGER.debug("Frames still in use. Leaving %r mapped", self)
+
+
+def _map_file(path):
+    with open(path, 'rb') as fp:
+        return mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def _read_index(mapping, key, frame_size):
+    magic, version, size, count, file_key = _HEADER.unpack_from(mapping)
+    if (magic, version, size, file_key) != (MAGIC, VERSION, frame_size, key):
+        return None
+    index = [
+        _INDEX.unpack_from(mapping, _HEADER.size + n * _INDEX.size)
+        for n in range(count)]
+    n_frames = sum(frames for _, frames in index)
+    if len(mapping) != _frames_offset(count) + n_frames * frame_size:
+        _LOGGER.warning("Frame file is truncated")
+        return None
+    return index
+
+
+def _frames_offset(count):
+    return _HEADER.size + count * _INDEX.size
@@ -0,0 +1,93 @@
+"""
+Packing of 1-bit frames into MAX7219 digit register values with NumPy. The
+device's rotation and block orientation are worked out once as a table of
+which pixel drives each bit of each register. Packing is then a gather and a
+packbits over the whole frame, or over every frame of a scroll at once.
+"""
+# pylint: disable=protected-access
+import numpy as np
+from PIL import Image
+
+N_DIGITS = 8
+N_BITS = 8
+
+
+def map_pixels(device):
+    """
+    Returns a digits x units x bits array holding the index of the pixel in a
+    flattened device sized image that drives each bit of each register. It is
+    found by passing an image of pixel indices through the device's own
+    preprocessing, which only moves pixels around.
+    """
+    n_pixels = device.width * device.height
+    indices = np.arange(1, n_pixels + 1, dtype=np.int32)
+    image = Image.fromarray(indices.reshape(device.height, device.width))
+    moved = np.asarray(device.preprocess(image), dtype=np.intp).ravel() - 1
+    offsets = np.asarray(device._offsets, dtype=np.intp)
+    positions = (
+        offsets[np.newaxis, :, np.newaxis]
+        + np.arange(N_DIGITS)[:, np.newaxis, np.newaxis]
+        + np.arange(N_BITS)[np.newaxis, np.newaxis, :] * device._w)
+    return moved[positions]
+
+
+class FramePacker:
+    """
+    Packs frames for a luma MAX7219 device into register values. Registers are
+    returned as a digits x units array of bytes where the units are in the
+    order that the device sends them in a transaction.
+    """
+    def __init__(self, device):
+        """Creates the packer for the device's size and orientation"""
+        self.width = device.width
+        self.height = device.height
+        self.cascaded = len(device._offsets)
+        self.digit_0 = device._const.DIGIT_0
+        self._pixels = map_pixels(device)
+
+    @property
+    def layout(self):
+        """
+        Returns bytes describing the pixel layout that the packer packs for so
+        that frames packed for one device can be matched to another
+        """
+        return self.digit_0.to_bytes(1, 'little') + self._pixels.tobytes()
+
+    def pack(self, image):
+        """Returns the registers for a device sized image"""
+        frame = np.asarray(image, dtype=np.uint8).ravel()
+        return self._pack(frame[self._pixels])
+
+    def pack_strip(self, strip, starts):
+        """
+        Returns the registers for every device sized window of the strip image
+        starting at the given columns. Columns beyond the end of the strip are
+        blank. The result has one set of registers per start.
+        """
+        pixels = np.asarray(strip, dtype=np.uint8)
+        starts = np.asarray(starts, dtype=np.intp)
+        padded = np.zeros(
+            (self.height, max(pixels.shape[1], starts.max() + self.width)),
+            dtype=np.uint8)
+        padded[:pixels.shape[0], :pixels.shape[1]] = pixels
+        columns = starts[:, np.newaxis] + np.arange(self.width)
+        # frames x height x width
+        frames = padded[:, columns].transpose(1, 0, 2)
+        frames = frames.reshape(len(starts), -1)
+        return self._pack(frames[:, self._pixels])
+
+    def transactions(self, registers):
+        """
+        Returns the bytes to send for each digit of the registers. Each row is
+        one transaction of (digit register, value) pairs for every unit.
+        """
+        registers = np.asarray(registers, dtype=np.uint8)
+        buf = np.empty(registers.shape + (2,), dtype=np.uint8)
+        buf[..., 0] = (np.arange(N_DIGITS) + self.digit_0)[:, np.newaxis]
+        buf[..., 1] = registers
+        return buf.reshape(registers.shape[:-1] + (2 * self.cascaded,))
+
+    @staticmethod
+    def _pack(bits):
+        packed = np.packbits(bits.astype(bool), axis=-1, bitorder='little')
+        return packed[..., 0]
@@ -0,0 +1,136 @@
+"""
+The playlist that decides which message the led matrix shows next. Each entry
+has a priority, a number of times it is repeated and a time it expires. The
+entry with the highest priority is always shown next, so a more important
+message pre-empts the others for as long as it lasts. Entries of the same
+priority take turns. Entries are held in a heap so choosing the next one takes
+O(log n) time.
+"""
+import heapq
+from collections import namedtuple
+from time import monotonic
+
+Item = namedtuple(
+    'Item', ['text', 'priority', 'dwell', 'repeat', 'expires_in'])
+Item.__new__.__defaults__ = (0, None, None, None)
+Item.__doc__ = """
+A message to show with its playlist settings.
+
+text -- the text of the message
+priority -- messages with a higher priority are shown first
+dwell -- seconds a static message is shown for, or None for the default
+repeat -- the number of times the message is shown, or None for no limit
+expires_in -- seconds until the message is no longer shown, or None
+"""
+
+
+class PlaylistEntry:
+    """An entry in a playlist. The key identifies the message to show."""
+    # pylint: disable=too-few-public-methods
+    def __init__(self, key, priority=0, repeat=None, expires=None):
+        self.key = key
+        self.priority = priority
+        self.repeat = repeat
+        self.expires = expires
+
+    def __repr__(self):
+        return "{}(key={!r}, priority={}, repeat={}, expires={})".format(
+            type(self).__name__,
+            self.key,
+            self.priority,
+            self.repeat,
+            self.expires)
+
+
+class Playlist:
+    """
+    Chooses the next entry to show. Entries are dropped once they have been
+    shown as many times as they repeat. Expired entries are dropped when they
+    reach the top.
+    """
+    def __init__(self, clock=monotonic):
+        """Creates an empty playlist. The clock may be replaced for testing"""
+        self._clock = clock
+        self._heap = []
+        self._turn = 0
+
+    def add(self, key, priority=0, repeat=None, expires_in=None):
+        """
+        Adds an entry for the key. It is dropped after it has been shown
+        repeat times or expires_in seconds from now, if given.
+        """
+        expires = None
+        if expires_in is not None:
+            expires = self._clock() + expires_in
+        entry = PlaylistEntry(key, priority, repeat, expires)
+        self._push(entry)
+        return entry
+
+    def peek(self):
+        """Returns the entry to be shown next or None if there is none"""
+        self._drop_finished()
+        return self._heap[0][-1] if self._heap else None
+
+    def next(self):
+        """
+        Returns the entry to show now and counts it as shown, or None if there
+        is nothing left to show
+        """
+        self._drop_finished()
+        if not self._heap:
+            return None
+        entry = heapq.heappop(self._heap)[-1]
+        self._shown(entry)
+        return entry
+
+    def take(self, entry):
+        """
+        Counts the entry as shown now, as next does, whether or not it is next
+        in turn. Returns the entry, or None if it is no longer in the playlist
+        or has expired.
+        """
+        for index, (_, _, queued) in enumerate(self._heap):
+            if queued is entry:
+                break
+        else:
+            return None
+        if self._is_finished(entry, self._clock()):
+            return None
+        self._heap[index] = self._heap[-1]
+        self._heap.pop()
+        heapq.heapify(self._heap)
+        self._shown(entry)
+        return entry
+
+    def time_left(self, entry):
+        """Returns the seconds until the entry expires or None if it doesn't"""
+        if entry.expires is None:
+            return None
+        return max(entry.expires - self._clock(), 0.0)
+
+    def __len__(self):
+        """Returns the number of entries, some of which may have expired"""
+        return len(self._heap)
+
+    def _shown(self, entry):
+        if entry.repeat is not None:
+            entry.repeat -= 1
+        if entry.repeat is None or entry.repeat > 0:
+            self._push(entry)
+
+    def _push(self, entry):
+        # entries of the same priority are shown in the order they were added
+        # and then in turn
+        self._turn += 1
+        heapq.heappush(self._heap, (-entry.priority, self._turn, entry))
+
+    def _drop_finished(self):
+        now = self._clock()
+        while self._heap and self._is_finished(self._heap[0][-1], now):
+            heapq.heappop(self._heap)
+
+    @staticmethod
+    def _is_finished(entry, now):
+        if entry.repeat is not None and entry.repeat <= 0:
+            return True
+        return entry.expires is not None and entry.expires <= now
@@ -0,0 +1,261 @@
+"""
+An led matrix that renders and drives the display in a child process. The
+LedMatrix worker thread shares the GIL with the stage and the widget updates,
+so scrolling and stepping stutter when they overlap. Here the LedMatrix runs
+in a child process that owns the device, so the two can run on separate cores.
+The main process sends it messages over a pipe.
+
+Rendering and SPI output both happen in the child, so frames never cross the
+process boundary on their way to the display. The ring buffer in shared memory
+is only for monitoring: the child copies each frame it sends to the display
+into it so that the main process can see what is shown without asking.
+
+The child is started with spawn rather than fork. The main process has other
+threads running by the time the display is made, such as the one homing the
+stage, and a forked child could inherit a lock one of them held.
+
+module constants:
+RING_SLOTS -- default number of frames held in the ring
+JOIN_TIMEOUT -- seconds to wait for the child process to exit when closing
+"""
+import logging
+from logging import getLogger
+import multiprocessing
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from sleepcounter.hardware_a.display.display import (
+    DWELL_TIME,
+    SCROLL_RATE,
+    LedMatrix)
+from sleepcounter.hardware_a.display.framediff import FrameDiffDevice
+from sleepcounter.hardware_a.display.interface import LedMatrixInterface
+from sleepcounter.hardware_a.display.packing import N_DIGITS
+
+RING_SLOTS = 64
+JOIN_TIMEOUT = 5
+
+_LOGGER = getLogger("led matrix process")
+
+# the count of frames written is held before the frames
+_COUNT = np.dtype(np.uint64)
+
+
+class FrameRing:
+    """
+    A ring of frame registers in shared memory written by one process and read
+    by others. Frame n is kept in slot n % slots until it is overwritten. The
+    count of frames written is only updated once a frame is complete, so a
+    reader can tell whether a frame was overwritten while it was copied.
+    """
+    def __init__(self, memory, frame_shape, slots, owner):
+        self._memory = memory
+        self._owner = owner
+        self.frame_shape = tuple(frame_shape)
+        self.slots = slots
+        self._count = np.ndarray((1,), _COUNT, buffer=memory.buf)
+        self._frames = np.ndarray(
+            (slots,) + self.frame_shape,
+            np.uint8,
+            buffer=memory.buf,
+            offset=_COUNT.itemsize)
+
+    @classmethod
+    def create(cls, frame_shape, slots=RING_SLOTS):
+        """Creates an empty ring, which is unlinked when it is closed"""
+        size = _COUNT.itemsize + slots * int(np.prod(frame_shape))
+        memory = SharedMemory(create=True, size=size)
+        ring = cls(memory, frame_shape, slots, owner=True)
+        ring._count[0] = 0
+        return ring
+
+    @classmethod
+    def attach(cls, name, frame_shape, slots=RING_SLOTS):
+        """Attaches to a ring created by another process"""
+        return cls(SharedMemory(name=name), frame_shape, slots, owner=False)
+
+    @property
+    def name(self):
+        """Returns the name of the shared memory holding the ring"""
+        return self._memory.name
+
+    @property
+    def written(self):
+        """Returns the number of frames written so far"""
+        return int(self._count[0])
+
+    def write(self, registers):
+        """Writes the registers of a frame into the next slot"""
+        count = self.written
+        self._frames[count % self.slots] = registers
+        self._count[0] = count + 1
+
+    def read(self, index):
+        """
+        Returns a copy of the frame with the index, or None if it has not been
+        written or has been overwritten
+        """
+        if not 0 <= index < self.written:
+            return None
+        frame = self._frames[index % self.slots].copy()
+        # the slot is being written again once the writer is a lap ahead
+        if self.written - index >= self.slots:
+            return None
+        return frame
+
+    def latest(self):
+        """Returns a copy of the last frame written or None if there is none"""
+        return self.read(self.written - 1)
+
+    def close(self):
+        """Lets go of the shared memory, unlinking it if the ring created it"""
+        del self._count, self._frames
+        self._memory.close()
+        if self._owner:
+            self._memory.unlink()
+
+
+class ProcessLedMatrix(LedMatrixInterface):
+    """
+    Shows messages like LedMatrix but from a child process. The device is made
+    in the child by calling device_factory, which must be picklable, so that
+    the SPI bus is only opened there. Copies of the frames sent to the device
+    can be read from the frames ring.
+    """
+    def __init__(
+            self,
+            device_factory,
+            scroll_rate=SCROLL_RATE,
+            dwell=DWELL_TIME,
+            frame_file=None,
+            slots=RING_SLOTS):
+        """
+        Starts the child process and waits for it to make the device. The
+        other arguments are passed to the LedMatrix in the child.
+        """
+        # pylint: disable=too-many-arguments
+        # the child must share the resource tracker so that the ring isn't
+        # taken to have leaked from this process when it exits
+        resource_tracker.ensure_running()
+        context = multiprocessing.get_context('spawn')
+        self._connection, child = context.Pipe()
+        self._process = context.Process(
+            target=_serve,
+            args=(
+                child,
+                device_factory,
+                scroll_rate,
+                dwell,
+                frame_file,
+                slots,
+                logging.getLogger().getEffectiveLevel()),
+            name="led matrix",
+            daemon=True)
+        self._process.start()
+        child.close()
+        name, frame_shape = self._receive()
+        self.frames = FrameRing.attach(name, frame_shape, slots)
+        _LOGGER.info("Started led matrix process %d", self._process.pid)
+
+    def show_messages(self, messages: list, scroll=False, dwell=None):
+        """
+        Shows messages from a list as LedMatrix.show_messages does. Returns
+        once the child has rendered them.
+        """
+        self._request('show_messages', list(messages), scroll, dwell)
+
+    def clear(self):
+        """Clear the display"""
+        self._request('clear')
+
+    def close(self):
+        """
+        Clears the display and stops the child process. The led matrix can't
+        be used once it is closed.
+        """
+        if self._process.is_alive():
+            self._connection.send(None)
+            self._process.join(JOIN_TIMEOUT)
+        if self._process.is_alive():
+            _LOGGER.warning("Led matrix process didn't stop. Terminating it")
+            self._process.terminate()
+        self._connection.close()
+        self.frames.close()
+
+    def _request(self, method, *args):
+        self._connection.send((method, args))
+        self._receive()
+
+    def _receive(self):
+        result, error = self._connection.recv()
+        if error is not None:
+            raise error
+        return result
+
+
+class _RingDevice:
+    """
+    Wraps the frame diff layer of an led matrix, writing the frames it sends
+    to the device to a ring
+    """
+    def __init__(self, device: FrameDiffDevice, ring: FrameRing):
+        self._device = device
+        self._ring = ring
+
+    def __getattr__(self, name):
+        return getattr(self._device, name)
+
+    def display_registers(self, registers, transactions=None):
+        """Sends the frame to the device, writing it to the ring if it was"""
+        sent = self._device.frames_sent
+        self._device.display_registers(registers, transactions)
+        if self._device.frames_sent != sent:
+            self._ring.write(registers)
+
+    def clear(self):
+        """Clears the device, writing a blank frame to the ring"""
+        self._device.clear()
+        self._ring.write(np.zeros(self._ring.frame_shape, np.uint8))
+
+
+def _serve(
+        connection,
+        device_factory,
+        scroll_rate,
+        dwell,
+        frame_file,
+        slots,
+        log_level):
+    """Runs the led matrix in the child process, answering each request"""
+    # pylint: disable=too-many-arguments
+    # a spawned child starts without the logging set up by the main process
+    logging.basicConfig(level=log_level)
+    try:
+        matrix = LedMatrix(device_factory(), scroll_rate, dwell, frame_file)
+    except Exception as err: # pylint: disable=broad-except
+        _LOGGER.exception("Failed to start led matrix")
+        connection.send((None, err))
+        return
+    ring = FrameRing.create((N_DIGITS, matrix.device.packer.cascaded), slots)
+    matrix.device = _RingDevice(matrix.device, ring)
+    connection.send(((ring.name, ring.frame_shape), None))
+    try:
+        while True:
+            request = connection.recv()
+            if request is None:
+                break
+            method, args = request
+            try:
+                result = getattr(matrix, method)(*args)
+            except Exception as err: # pylint: disable=broad-except
+                _LOGGER.exception("Led matrix request %s failed", method)
+                connection.send((None, err))
+            else:
+                connection.send((result, None))
+    except EOFError:
+        _LOGGER.info("Main process has gone. Stopping")
+    finally:
+        matrix.clear()
+        ring.close()
@@ -0,0 +1,104 @@
+"""
+An asyncio renderer for the led matrix. Frames are played by a task on the
+running event loop rather than by a worker thread so that the display can share
+one loop with the other hardware widgets.
+"""
+import asyncio
+from logging import getLogger
+
+from sleepcounter.hardware_a.display.display import LedMatrix
+
+_LOGGER = getLogger("led matrix renderer")
+
+
+class AsyncLedMatrix(LedMatrix):
+    """
+    Led matrix whose messages are shown by a task on the running event loop.
+    It is used in the same way as LedMatrix but show_messages must be called
+    from a coroutine or callback on the loop.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._worker = _DeviceTaskManager(self._activity_async)
+
+    async def _activity_async(self):
+        """
+        The display's activity run as a task on the event loop. A lone static
+        message is drawn once and the task then waits until it is stopped or
+        the message expires. Once every message has expired or been repeated
+        the display is cleared.
+        """
+        if not self._to_display:
+            await self._worker.wait()
+            return
+        for frames, first, dwell in self._playlist():
+            if len(frames) > 1:
+                await self._scroll_frames_async(frames, first)
+            else:
+                self._show_frame(frames[0])
+                await self._worker.wait(dwell)
+        if not self._worker.stopping:
+            _LOGGER.info("Playlist finished")
+            self.device.clear()
+            await self._worker.wait()
+
+    async def _scroll_frames_async(self, frames, first=0):
+        index, _ = self._position
+        count = len(frames) - first
+        async for offset in self._scheduler.frames_async(count):
+            self._position = (index, first + offset)
+            self._show_frame(frames[first + offset])
+
+
+class _DeviceTaskManager:
+
+    def __init__(self, target):
+        """
+        Manages the device's task of activity on the running event loop
+        """
+        self._target = target
+        self._wake = None
+        self._task = None
+
+    def start(self):
+        """
+        Start the task of activity, stopping any task already running
+        """
+        self.stop()
+        _LOGGER.debug("Starting task...")
+        self._wake = asyncio.Event()
+        self._task = asyncio.get_running_loop().create_task(self._activity())
+
+    def stop(self):
+        """
+        Stop the task of activity. The task is cancelled where it is waiting
+        so it will not draw another frame.
+        """
+        if self._task:
+            _LOGGER.debug("Cancelling task")
+            self._wake.set()
+            self._task.cancel()
+            self._task = None
+
+    @property
+    def stopping(self):
+        """
+        Returns True if the task of activity has been asked to stop
+        """
+        return self._wake is None or self._wake.is_set()
+
+    async def wait(self, timeout=None):
+        """
+        Waits for timeout seconds or indefinitely if no timeout is given.
+        Returns early with True if a stop is requested.
+        """
+        try:
+            return await asyncio.wait_for(self._wake.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+
+    async def _activity(self):
+        while not self.stopping:
+            await self._target()
+            # let the loop run between passes of a playlist that never waits
+            await asyncio.sleep(0)
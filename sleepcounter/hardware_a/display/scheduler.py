@@ -0,0 +1,132 @@
+"""
+Frame scheduling for the led matrix worker. Frames are paced against deadlines
+taken from a monotonic clock so that the scroll rate does not drift with the
+time it takes to render and send each frame. If the worker falls behind, late
+frames are dropped rather than slowing the animation down.
+"""
+import asyncio
+from contextlib import closing
+from logging import getLogger
+from time import monotonic, sleep
+
+_LOGGER = getLogger("frame scheduler")
+
+
+class FrameStatistics:
+    """
+    Running statistics for frames produced by a FrameScheduler
+    """
+    def __init__(self):
+        self.rendered = 0
+        self.dropped = 0
+        self.elapsed = 0.0
+        self.total_frame_time = 0.0
+        self.max_frame_time = 0.0
+
+    def record_frame(self, frame_time: float):
+        """Record a frame that was rendered in frame_time seconds"""
+        self.rendered += 1
+        self.total_frame_time += frame_time
+        self.max_frame_time = max(self.max_frame_time, frame_time)
+
+    def record_dropped(self, count: int):
+        """Record frames that were skipped because their deadline passed"""
+        self.dropped += count
+
+    @property
+    def fps(self):
+        """Returns the measured number of frames rendered per second"""
+        if not self.elapsed:
+            return 0.0
+        return self.rendered / self.elapsed
+
+    @property
+    def mean_frame_time(self):
+        """Returns the mean time taken to render a frame in seconds"""
+        if not self.rendered:
+            return 0.0
+        return self.total_frame_time / self.rendered
+
+    def __repr__(self):
+        return (
+            "{}(rendered={}, dropped={}, fps={:.1f}, mean_frame_time={:.4f}, "
+            "max_frame_time={:.4f})".format(
+                type(self).__name__,
+                self.rendered,
+                self.dropped,
+                self.fps,
+                self.mean_frame_time,
+                self.max_frame_time))
+
+
+class FrameScheduler:
+    """
+    Paces a sequence of frames at a fixed rate. Each frame has a deadline
+    relative to the start of the sequence so that errors do not accumulate.
+    """
+    def __init__(self, rate: float, clock=monotonic, wait=sleep):
+        """
+        Creates a scheduler producing frames at rate frames per second. The
+        clock and wait functions may be replaced for testing.
+        """
+        if rate <= 0:
+            raise ValueError("Frame rate must be positive, got {}".format(rate))
+        self.rate = rate
+        self._clock = clock
+        self._wait = wait
+        self.statistics = FrameStatistics()
+
+    @property
+    def period(self):
+        """Returns the time between frames in seconds"""
+        return 1 / self.rate
+
+    def frames(self, count: int):
+        """
+        Generates the indices of the frames in a sequence of count frames that
+        should be rendered. The caller renders each frame as it is yielded.
+        Frames whose deadline has already passed are skipped.
+        """
+        with closing(self._schedule(count)) as schedule:
+            for index, delay in schedule:
+                if index is None:
+                    self._wait(delay)
+                else:
+                    yield index
+
+    async def frames_async(self, count: int):
+        """
+        Generates the indices of frames to render in the same way as frames
+        but waits for each deadline on the running event loop
+        """
+        with closing(self._schedule(count)) as schedule:
+            for index, delay in schedule:
+                if index is None:
+                    await asyncio.sleep(delay)
+                else:
+                    yield index
+
+    def _schedule(self, count):
+        # yields (index, None) for a frame to render or (None, delay) to wait
+        start = self._clock()
+        index = 0
+        try:
+            while index < count:
+                now = self._clock()
+                due = int((now - start) * self.rate)
+                if due > index:
+                    dropped = min(due, count) - index
+                    _LOGGER.debug("Dropping %d late frame(s)", dropped)
+                    self.statistics.record_dropped(dropped)
+                    index = due
+                    if index >= count:
+                        break
+                yield index, None
+                finished = self._clock()
+                self.statistics.record_frame(finished - now)
+                index += 1
+                remaining = start + index * self.period - finished
+                if remaining > 0:
+                    yield None, remaining
+        finally:
+            self.statistics.elapsed += self._clock() - start
@@ -0,0 +1,89 @@
+"""
+Glyph atlases for the fonts in the library. Each character is rasterised once
+per font and size into a 1-bit glyph bitmap. Text is then measured by summing
+glyph advances and rendered by blitting glyphs side by side so that FreeType is
+only called the first time a character is seen.
+
+module constants:
+TEXT_CACHE_SIZE -- the number of text metrics and bitmaps that are cached
+"""
+from functools import lru_cache
+
+from PIL import Image, ImageDraw, ImageFont
+
+from sleepcounter.hardware_a.fonts.library import available_fonts
+
+TEXT_CACHE_SIZE = 128
+
+
+class GlyphAtlas:
+    """
+    A cache of glyph bitmaps for one of the available fonts at a given size
+    """
+    def __init__(self, font_name: str, size: int):
+        """Creates the atlas for the font in the library and point size"""
+        self.font_name = font_name
+        self.size = size
+        self._font = ImageFont.truetype(
+            font=available_fonts()[font_name], size=size)
+        ascent, descent = self._font.getmetrics()
+        self._line_height = ascent + descent
+        self._glyphs = {}
+
+    def glyph(self, char: str):
+        """
+        Returns the 1-bit bitmap for a single character. The bitmap is as wide
+        as the character's advance and as tall as a line of text.
+        """
+        try:
+            return self._glyphs[char]
+        except KeyError:
+            # the advance is the distance to the start of the next character
+            width = round(self._font.getlength(char))
+            glyph = Image.new("1", (width, self._line_height))
+            ImageDraw.Draw(glyph).text(
+                (0, 0), char, font=self._font, fill="white")
+            self._glyphs[char] = glyph
+            return glyph
+
+    def text_size(self, text: str):
+        """Returns the (width, height) of the text in pixels"""
+        glyphs = [self.glyph(char) for char in text]
+        width = sum(glyph.width for glyph in glyphs)
+        height = max((glyph.height for glyph in glyphs), default=0)
+        return width, height
+
+    def render(self, text: str):
+        """Returns a 1-bit bitmap of the text composed from the glyphs"""
+        image = Image.new("1", self.text_size(text))
+        x_pos = 0
+        for char in text:
+            glyph = self.glyph(char)
+            image.paste(glyph, (x_pos, 0), mask=glyph)
+            x_pos += glyph.width
+        return image
+
+    def __repr__(self):
+        return "{}(font_name={}, size={})".format(
+            type(self).__name__, self.font_name, self.size)
+
+
+@lru_cache(maxsize=None)
+def get_atlas(font_name: str, size: int):
+    """Returns the shared glyph atlas for the font and size"""
+    return GlyphAtlas(font_name, size)
+
+
+@lru_cache(maxsize=TEXT_CACHE_SIZE)
+def text_size(font_name: str, size: int, text: str):
+    """Returns the (width, height) of the text in pixels using a cache"""
+    return get_atlas(font_name, size).text_size(text)
+
+
+@lru_cache(maxsize=TEXT_CACHE_SIZE)
+def render_text(font_name: str, size: int, text: str):
+    """
+    Returns a 1-bit bitmap of the text using a cache. The bitmap is shared so
+    it must not be modified.
+    """
+    return get_atlas(font_name, size).render(text)
@@ -3,13 +3,27 @@ A library of all ttf fonts available for the display widget
 
 module constants:
 FONT_DIR -- directory containing fonts
-AVAILABLE_FONTS -- a dictionary of all available fonts
+AVAILABLE_FONTS -- a dictionary of all available fonts. The font directory is
+                   scanned the first time this is accessed.
 """
+from functools import lru_cache
 from os import path, listdir
 
 FONT_DIR = path.dirname(path.realpath(__file__))
 
-AVAILABLE_FONTS = {}
-for file in listdir(FONT_DIR):
-    if file.endswith('.ttf'):
-        AVAILABLE_FONTS[file] = path.join(FONT_DIR, file)
+
+@lru_cache(maxsize=None)
+def available_fonts():
+    """Returns a dictionary of font file paths keyed by file name"""
+    fonts = {}
+    for file in listdir(FONT_DIR):
+        if file.endswith('.ttf'):
+            fonts[file] = path.join(FONT_DIR, file)
+    return fonts
+
+
+def __getattr__(name):
+    if name == 'AVAILABLE_FONTS':
+        return available_fonts()
+    raise AttributeError(
+        "module {!r} has no attribute {!r}".format(__name__, name))
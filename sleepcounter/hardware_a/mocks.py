@@ -1,8 +1,10 @@
 """Mock hardware implementation"""
 import logging
+from time import monotonic
 
 from stage import exceptions
-from unittest.mock import Mock
+
+from sleepcounter.hardware_a.display.emulator import EmulatedMax7219
 
 LOGGER = logging.getLogger("mock")
 
@@ -25,6 +27,11 @@ class MockStage:
         LOGGER.info("Moving to home position")
         self._position = self.max
 
+    def calibrate(self, position):
+        """Declare the current position index without moving"""
+        LOGGER.info("Calibrating stage at position %s", position)
+        self._position = position
+
     @property
     def max(self):
         """Return the maximum position index"""
@@ -46,41 +53,31 @@ class MockStage:
         self._position = request
 
 
-class Matrix:
+class FakeGpioSink:
     """
-    A mock for an led matrix device
+    A sink for motor pin states that records each state written with the time
+    it was written instead of setting any pins
     """
-    _width = 32
-    _height = 8
-    _mode = "1"
-
+    # pylint: disable=too-few-public-methods
     def __init__(self):
-        _LOGGER.info("Created mock led matrix device %r", self)
-        self.display = Mock()
+        self.writes = []
 
-    @property
-    def width(self):
-        """
-        Width of the display in pixels
-        """
-        return Matrix._width
+    def write(self, state):
+        """Record the state"""
+        self.writes.append((monotonic(), state))
 
     @property
-    def height(self):
-        """
-        Height of the display in pixels
-        """
-        return Matrix._height
+    def states(self):
+        """Return the states written so far"""
+        return [state for _, state in self.writes]
 
-    @property
-    def mode(self):
-        """
-        Returns mode which is needed for image drawing reasons
-        """
-        return Matrix._mode
-
-    def clear(self):
-        """
-        Clear the display
-        """
-        _LOGGER.info("Clearing device %r", self)
+
+class Matrix(EmulatedMax7219):
+    """
+    A mock for an led matrix device. This is the emulated device cascaded and
+    oriented like the real display so the real rendering path is exercised.
+    """
+    # pylint: disable=too-few-public-methods
+    def __init__(self):
+        super().__init__(cascaded=4, block_orientation=-90, rotate=2)
+        LOGGER.info("Created mock led matrix device %r", self)
@@ -0,0 +1,86 @@
+"""
+Arbitrates the commands that several widgets send to one stage. Without it
+each widget would drive the stage through its own executor, so their moves,
+homes and ends would fight over it and each would run in full even after
+another had replaced it. Here every command goes through one MotionExecutor,
+so the latest command wins: a command still waiting when another arrives is
+dropped and a move in progress is abandoned at its next step.
+"""
+import logging
+from threading import Lock
+
+from sleepcounter.hardware_a.motion.executor import MotionExecutor
+
+LOGGER = logging.getLogger("stage arbiter")
+
+
+class StageArbiter:
+    """
+    Shares a stage between widgets. An arbiter is passed to each stage widget
+    in place of the executor class, and the widgets then send their commands
+    through it. Every widget is told when the stage starts moving and where it
+    comes to rest, whichever widget asked for the move.
+    """
+    def __init__(self, stage, planner=None):
+        """Creates the arbiter for the stage, starting its executor"""
+        self.stage = stage
+        self._listeners = []
+        self._lock = Lock()
+        self._executor = MotionExecutor(
+            stage, planner, on_position=self._on_position)
+
+    def __call__(self, stage, planner=None, on_position=None):
+        """
+        Registers a widget with the arbiter, taking the arguments a motion
+        executor is created with, and returns the arbiter for the widget to
+        send its commands to. Moves are planned by the arbiter's own planner.
+        """
+        if stage is not self.stage:
+            raise ValueError(
+                "Arbiter for {!r} can't drive {!r}".format(self.stage, stage))
+        if planner is not None:
+            LOGGER.debug("Ignoring planner %r for shared stage", planner)
+        if on_position is not None:
+            with self._lock:
+                self._listeners.append(on_position)
+        return self
+
+    @property
+    def idle(self):
+        """Returns True if the stage is not moving and no command is pending"""
+        return self._executor.idle
+
+    @property
+    def queue_depth(self):
+        """Returns the number of commands waiting to be started"""
+        return self._executor.queue_depth
+
+    @property
+    def statistics(self):
+        """Returns the CommandStatistics for the commands sent so far"""
+        return self._executor.statistics
+
+    def move_to(self, target: int):
+        """Requests a move to the target position without waiting for it"""
+        self._executor.move_to(target)
+
+    def home(self):
+        """Requests that the stage is homed without waiting for it"""
+        self._executor.home()
+
+    def end(self):
+        """Requests that the stage goes to its end without waiting for it"""
+        self._executor.end()
+
+    def wait(self, timeout=None):
+        """
+        Blocks until the stage has stopped moving or the timeout in seconds
+        expires. Returns True if the stage is idle.
+        """
+        return self._executor.wait(timeout)
+
+    def _on_position(self, position):
+        with self._lock:
+            listeners = list(self._listeners)
+        for listener in listeners:
+            listener(position)
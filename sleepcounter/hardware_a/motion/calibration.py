@@ -0,0 +1,78 @@
+"""
+Lets a stage be told where it is without moving it. The stage widgets resume
+from the position they recorded and the waveform executor tells the stage
+where each move left it, both through a calibrate method. MockStage has one
+but the Stage from the stage package does not: it only changes the position
+index it keeps as it steps. CalibratedStage wraps such a stage and calibrates
+it by setting that index directly.
+
+module constants:
+POSITION_ATTRIBUTE -- attribute in which the wrapped stage keeps its position
+"""
+import logging
+
+from stage import exceptions
+
+LOGGER = logging.getLogger("calibration")
+
+POSITION_ATTRIBUTE = '_position'
+
+
+class CalibratedStage:
+    """
+    Wraps a stage that keeps its position in POSITION_ATTRIBUTE, adding a
+    calibrate method. Everything else is passed on to the wrapped stage.
+    """
+    def __init__(self, stage):
+        if not hasattr(stage, POSITION_ATTRIBUTE):
+            raise ValueError(
+                "Stage {!r} has no position to calibrate".format(stage))
+        self._stage = stage
+
+    @classmethod
+    def wrap(cls, stage):
+        """
+        Returns the stage if it can already be calibrated, else the stage
+        wrapped so that it can be. A stage that can't be wrapped is returned
+        as it is, and will be homed rather than resumed.
+        """
+        if hasattr(stage, 'calibrate'):
+            return stage
+        try:
+            return cls(stage)
+        except ValueError:
+            LOGGER.warning("Stage %r can't be calibrated", stage)
+            return stage
+
+    def __getattr__(self, name):
+        return getattr(self._stage, name)
+
+    def home(self):
+        """Move to home position"""
+        self._stage.home()
+
+    def end(self):
+        """Move to end position"""
+        self._stage.end()
+
+    def calibrate(self, position):
+        """Declare the current position index without moving"""
+        if not 0 <= position <= self.max:
+            raise exceptions.OutOfRangeError(
+                "Cannot calibrate at position {}".format(position))
+        LOGGER.info("Calibrating stage at position %s", position)
+        setattr(self._stage, POSITION_ATTRIBUTE, position)
+
+    @property
+    def max(self):
+        """Return the maximum position index"""
+        return self._stage.max
+
+    @property
+    def position(self):
+        """Return the current position index"""
+        return self._stage.position
+
+    @position.setter
+    def position(self, request):
+        self._stage.position = request
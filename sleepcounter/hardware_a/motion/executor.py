@@ -0,0 +1,292 @@
+"""
+Executes planned moves for a stage in a background thread, or in a task on an
+asyncio event loop, so that callers are not blocked while the stage is moving.
+
+module constants:
+HOME -- a target that homes the stage
+END -- a target that sends the stage to its end
+"""
+import asyncio
+import logging
+from threading import Condition, Thread
+from time import monotonic, sleep
+
+from stage import exceptions
+
+from sleepcounter.hardware_a.motion.planner import MotionPlanner
+
+LOGGER = logging.getLogger("motion executor")
+
+HOME = 'home'
+END = 'end'
+
+
+class CommandStatistics:
+    """
+    Running statistics for the commands sent to a MotionExecutor
+    """
+    def __init__(self):
+        self.submitted = 0
+        self.coalesced = 0
+        self.cancelled = 0
+        self.started = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+
+    def record_start(self, latency: float):
+        """Record a command that started latency seconds after it was sent"""
+        self.started += 1
+        self.total_latency += latency
+        self.max_latency = max(self.max_latency, latency)
+
+    @property
+    def mean_latency(self):
+        """Returns the mean time from sending a command to starting it"""
+        if not self.started:
+            return 0.0
+        return self.total_latency / self.started
+
+    def __repr__(self):
+        return (
+            "{}(submitted={}, coalesced={}, cancelled={}, started={}, "
+            "mean_latency={:.4f}, max_latency={:.4f})".format(
+                type(self).__name__,
+                self.submitted,
+                self.coalesced,
+                self.cancelled,
+                self.started,
+                self.mean_latency,
+                self.max_latency))
+
+
+class MotionExecutor:
+    """
+    Moves a stage towards a target in a background thread. Requesting a target
+    returns immediately. If a move is already in progress it is abandoned at
+    the next step and a new move is planned from wherever the stage has got to.
+    A target that is still waiting when another is requested is dropped. The
+    target may also be HOME or END, which are run by the stage in full.
+    """
+    # pylint: disable=too-many-instance-attributes
+    def __init__(self, stage, planner=None, on_position=None):
+        """
+        Creates the executor for the stage, starting its thread. If given,
+        on_position is called with None when the stage starts moving and with
+        its position once it has come to rest.
+        """
+        self._stage = stage
+        self._planner = planner or MotionPlanner()
+        self._on_position = on_position
+        self._condition = Condition()
+        self._target = None
+        self._submitted = None
+        self._moving = False
+        self.statistics = CommandStatistics()
+        self._thread = Thread(target=self._activity, daemon=True)
+        self._thread.start()
+
+    @property
+    def idle(self):
+        """Returns True if the stage is not moving and no move is pending"""
+        with self._condition:
+            return self._is_idle()
+
+    @property
+    def queue_depth(self):
+        """Returns the number of commands waiting to be started"""
+        with self._condition:
+            return 0 if self._target is None else 1
+
+    def move_to(self, target):
+        """Requests a move to the target position without waiting for it"""
+        with self._condition:
+            LOGGER.debug("Requesting move to %s", target)
+            self.statistics.submitted += 1
+            if self._target is not None:
+                LOGGER.debug("Dropping request for %s", self._target)
+                self.statistics.coalesced += 1
+            self._target = target
+            self._submitted = monotonic()
+            self._condition.notify_all()
+
+    def home(self):
+        """Requests that the stage is homed without waiting for it"""
+        self.move_to(HOME)
+
+    def end(self):
+        """Requests that the stage goes to its end without waiting for it"""
+        self.move_to(END)
+
+    def wait(self, timeout=None):
+        """
+        Blocks until the stage has stopped moving or the timeout in seconds
+        expires. Returns True if the stage is idle.
+        """
+        with self._condition:
+            return self._condition.wait_for(self._is_idle, timeout)
+
+    def _is_idle(self):
+        return self._target is None and not self._moving
+
+    def _activity(self):
+        at_rest = True
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._target is not None)
+                target = self._target
+                self._target = None
+                self._moving = True
+                self.statistics.record_start(monotonic() - self._submitted)
+            if at_rest and target != self._stage.position:
+                at_rest = False
+                self._notify(None)
+            try:
+                self._run(target)
+            except exceptions.OutOfRangeError as err:
+                LOGGER.error("Failed to move stage to %s: %s", target, err)
+            except Exception: # pylint: disable=broad-except
+                # the thread must outlive a failed move or nothing would
+                # move the stage again
+                LOGGER.exception("Failed to move stage to %s", target)
+            with self._condition:
+                finished = self._target is None
+            if finished and not at_rest:
+                at_rest = True
+                self._notify(self._stage.position)
+            with self._condition:
+                if self._target is None:
+                    self._moving = False
+                    self._condition.notify_all()
+
+    def _notify(self, position):
+        if self._on_position is not None:
+            self._on_position(position)
+
+    def _run(self, target):
+        if target == HOME:
+            LOGGER.info("Homing stage")
+            self._stage.home()
+            return
+        if target == END:
+            LOGGER.info("Moving stage to its end")
+            self._stage.end()
+            return
+        move = self._planner.plan(self._stage.position, target)
+        LOGGER.info("Moving stage %s", move)
+        # steps are timed against deadlines so that the time the stage takes
+        # to make each step doesn't slow the move down
+        deadline = monotonic()
+        for position, interval in move:
+            if self._target is not None:
+                LOGGER.info("Move superseded by request for %s", self._target)
+                with self._condition:
+                    self.statistics.cancelled += 1
+                return
+            deadline += interval
+            remaining = deadline - monotonic()
+            if remaining > 0:
+                sleep(remaining)
+            self._stage.position = position
+
+
+class AsyncMotionExecutor:
+    """
+    Moves a stage towards a target in a task on the running event loop. It
+    behaves like MotionExecutor but the steps are timed by the loop, so the
+    stage can be driven alongside other tasks without a thread. The task is
+    started by the first request for a move, which must be made on the loop.
+    """
+    # pylint: disable=too-many-instance-attributes
+    def __init__(self, stage, planner=None, on_position=None):
+        """
+        Creates the executor for the stage. If given, on_position is called
+        with None when the stage starts moving and with its position once it
+        has come to rest.
+        """
+        self._stage = stage
+        self._planner = planner or MotionPlanner()
+        self._on_position = on_position
+        self._target = None
+        self._moving = False
+        self._requested = None
+        self._rested = None
+        self._task = None
+
+    @property
+    def idle(self):
+        """Returns True if the stage is not moving and no move is pending"""
+        return self._target is None and not self._moving
+
+    def move_to(self, target: int):
+        """Requests a move to the target position without waiting for it"""
+        LOGGER.debug("Requesting move to %d", target)
+        if self._task is None or self._task.done():
+            self._requested = asyncio.Event()
+            self._rested = asyncio.Event()
+            self._task = asyncio.get_running_loop().create_task(
+                self._activity())
+        self._target = target
+        self._rested.clear()
+        self._requested.set()
+
+    async def wait(self, timeout=None):
+        """
+        Waits until the stage has stopped moving or the timeout in seconds
+        expires. Returns True if the stage is idle.
+        """
+        if self.idle:
+            return True
+        try:
+            await asyncio.wait_for(self._rested.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        return self.idle
+
+    def stop(self):
+        """Abandons any move and stops the executor's task"""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self._target = None
+        self._moving = False
+
+    async def _activity(self):
+        at_rest = True
+        while True:
+            await self._requested.wait()
+            self._requested.clear()
+            target = self._target
+            self._target = None
+            self._moving = True
+            if at_rest and target != self._stage.position:
+                at_rest = False
+                self._notify(None)
+            try:
+                await self._run(target)
+            except exceptions.OutOfRangeError as err:
+                LOGGER.error("Failed to move stage to %d: %s", target, err)
+            except Exception: # pylint: disable=broad-except
+                LOGGER.exception("Failed to move stage to %d", target)
+            if self._target is None:
+                if not at_rest:
+                    at_rest = True
+                    self._notify(self._stage.position)
+                self._moving = False
+                self._rested.set()
+
+    def _notify(self, position):
+        if self._on_position is not None:
+            self._on_position(position)
+
+    async def _run(self, target):
+        move = self._planner.plan(self._stage.position, target)
+        LOGGER.info("Moving stage %s", move)
+        deadline = monotonic()
+        for position, interval in move:
+            if self._target is not None:
+                LOGGER.info("Move superseded by request for %d", self._target)
+                return
+            deadline += interval
+            # sleeping for no time still lets other tasks run between steps
+            await asyncio.sleep(max(deadline - monotonic(), 0))
+            self._stage.position = position
@@ -0,0 +1,99 @@
+"""
+Plans moves of a stepper motor driven stage. A move is split into incremental
+steps, each with the interval to wait before it is taken, so that the stage
+accelerates away from the start and decelerates into the target rather than
+jumping straight to the target at full speed.
+
+module constants:
+MAX_SPEED -- default cruising speed in steps per second
+ACCELERATION -- default acceleration in steps per second per second
+"""
+from math import sqrt
+
+import numpy as np
+
+MAX_SPEED = 800
+ACCELERATION = 4000
+
+
+class Move:
+    """
+    A planned move between two positions following a trapezoidal velocity
+    profile. Iterating over the move yields (position, interval) pairs where
+    interval is the time in seconds to wait before moving to position.
+    """
+    def __init__(self, start: int, target: int, max_speed, acceleration):
+        self.start = start
+        self.target = target
+        self.max_speed = max_speed
+        self.acceleration = acceleration
+
+    @property
+    def distance(self):
+        """Returns the number of steps in the move"""
+        return abs(self.target - self.start)
+
+    @property
+    def direction(self):
+        """Returns +1 for moves away from home, -1 towards it and 0 if still"""
+        if self.target == self.start:
+            return 0
+        return 1 if self.target > self.start else -1
+
+    @property
+    def duration(self):
+        """Returns the time taken by the move in seconds"""
+        return sum(interval for _, interval in self)
+
+    def speed_at(self, step: int):
+        """
+        Returns the speed in steps per second for the given step of the move
+        where 0 is the first step. The speed is limited by the distance that
+        is needed to accelerate from rest and to decelerate to rest.
+        """
+        accelerating = sqrt(2 * self.acceleration * (step + 1))
+        decelerating = sqrt(2 * self.acceleration * (self.distance - step))
+        return min(self.max_speed, accelerating, decelerating)
+
+    def intervals(self):
+        """
+        Returns an array of the interval before each step of the move, worked
+        out for every step at once
+        """
+        steps = np.arange(self.distance, dtype=np.float64)
+        accelerating = np.sqrt(2 * self.acceleration * (steps + 1))
+        decelerating = np.sqrt(2 * self.acceleration * (self.distance - steps))
+        speeds = np.minimum(
+            np.minimum(accelerating, decelerating), self.max_speed)
+        return 1 / speeds
+
+    def __iter__(self):
+        position = self.start
+        for step in range(self.distance):
+            position += self.direction
+            yield position, 1 / self.speed_at(step)
+
+    def __len__(self):
+        return self.distance
+
+    def __repr__(self):
+        return "{}(start={}, target={})".format(
+            type(self).__name__, self.start, self.target)
+
+
+class MotionPlanner:
+    """
+    Plans the shortest move from the current position of a stage to a target
+    """
+    # pylint: disable=too-few-public-methods
+    def __init__(self, max_speed=MAX_SPEED, acceleration=ACCELERATION):
+        if max_speed <= 0 or acceleration <= 0:
+            raise ValueError(
+                "Speed and acceleration must be positive, got {} and {}"
+                .format(max_speed, acceleration))
+        self.max_speed = max_speed
+        self.acceleration = acceleration
+
+    def plan(self, start: int, target: int):
+        """Returns the move from the start position to the target"""
+        return Move(start, target, self.max_speed, self.acceleration)
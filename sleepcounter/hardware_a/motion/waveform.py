@@ -0,0 +1,156 @@
+"""
+Drives the stepper motor by playing back waveforms compiled from planned moves.
+Stepping the stage through the stage package works out and writes each step
+in Python as it goes, so the step rate jitters with interpreter scheduling and
+with the display render thread. Here a whole move is compiled ahead of time
+into arrays of pin states and the times they are due. Playing them back is
+then a loop of waiting and writing, which sleeps until just before each step
+and spins for the rest so that steps are on time. The spin is kept short as
+it is paid for in CPU time on every step.
+
+Pin states are bit masks with a bit for each motor pin, in the order the pins
+are given to the sink. The phase of each step is taken from the position it
+leaves the stage at, so moves always pick up from the phase they left off.
+
+module constants:
+FULL_STEP -- pin states for each phase of two phase on full stepping with the
+pins in the order a1, b1, a2, b2
+SPIN_SEC -- time before a step that playback stops sleeping and spins
+"""
+import logging
+from time import monotonic, sleep
+
+import numpy as np
+from stage import exceptions
+
+from sleepcounter.hardware_a.motion.executor import END, HOME, MotionExecutor
+
+LOGGER = logging.getLogger("waveform")
+
+FULL_STEP = (0b0011, 0b0110, 0b1100, 0b1001)
+SPIN_SEC = 0.0001
+
+
+class Waveform:
+    """
+    A move compiled into pin states. The state at each index is due at its time
+    in seconds from the start of playback and leaves the stage at its position.
+    """
+    def __init__(self, times, states, positions):
+        self.times = times
+        self.states = states
+        self.positions = positions
+
+    @classmethod
+    def compile(cls, move, sequence=FULL_STEP):
+        """Compiles the move into a waveform stepping through the sequence"""
+        positions = (
+            move.start
+            + move.direction * np.arange(1, move.distance + 1, dtype=np.int64))
+        states = np.asarray(sequence, dtype=np.uint8)[
+            positions % len(sequence)]
+        return cls(np.cumsum(move.intervals()), states, positions)
+
+    @property
+    def duration(self):
+        """Returns the time taken to play the waveform in seconds"""
+        return float(self.times[-1]) if len(self) else 0.0
+
+    def __len__(self):
+        return len(self.states)
+
+    def __repr__(self):
+        return "{}(steps={}, duration={:.3f})".format(
+            type(self).__name__, len(self), self.duration)
+
+
+class GpioSink:
+    """
+    Writes pin states to GPIO pins, only writing the pins that change. gpio is
+    the RPi.GPIO module or one like it whose mode has already been set.
+    """
+    # pylint: disable=too-few-public-methods
+    def __init__(self, gpio, pins):
+        self._gpio = gpio
+        self._pins = tuple(pins)
+        self._state = None
+        for pin in self._pins:
+            gpio.setup(pin, gpio.OUT)
+
+    def write(self, state: int):
+        """Sets each pin to its bit of the state"""
+        changed = state if self._state is None else state ^ self._state
+        for bit, pin in enumerate(self._pins):
+            if changed >> bit & 1:
+                self._gpio.output(pin, state >> bit & 1)
+        self._state = state
+
+
+class WaveformPlayer:
+    """Plays waveforms into a sink with a write(state) method"""
+    # pylint: disable=too-few-public-methods
+    def __init__(self, sink, spin=SPIN_SEC):
+        self._sink = sink
+        self._spin = spin
+
+    def play(self, waveform, cancelled=None):
+        """
+        Writes each state of the waveform to the sink when it is due, blocking
+        until they have all been written. If given, cancelled is called before
+        each step and playback stops if it returns True. Returns the number of
+        states written.
+        """
+        start = monotonic()
+        # lists are quicker to step through than arrays
+        deadlines = (waveform.times + start).tolist()
+        states = waveform.states.tolist()
+        write = self._sink.write
+        for index, (deadline, state) in enumerate(zip(deadlines, states)):
+            if cancelled is not None and cancelled():
+                return index
+            remaining = deadline - monotonic()
+            if remaining > self._spin:
+                sleep(remaining - self._spin)
+            while monotonic() < deadline:
+                pass
+            write(state)
+        return len(states)
+
+
+class WaveformExecutor(MotionExecutor):
+    """
+    A MotionExecutor that moves the stage by playing compiled waveforms into a
+    sink rather than setting the position of the stage a step at a time. The
+    stage is told its position once the move has finished or been abandoned.
+    HOME and END are still done by the stage, which finds its end stops.
+    """
+    def __init__(self, stage, planner=None, on_position=None, *, sink):
+        """
+        Creates the executor for the stage, starting its thread. Moves are
+        written to the sink, which should drive the stage's motor pins. The
+        stage must have a calibrate method to be told where moves leave it.
+        """
+        if not hasattr(stage, 'calibrate'):
+            raise ValueError(
+                "Stage {!r} can't be calibrated after a move".format(stage))
+        self._player = WaveformPlayer(sink)
+        super().__init__(stage, planner, on_position)
+
+    def _run(self, target):
+        if target in (HOME, END):
+            super()._run(target)
+            return
+        if not 0 <= target <= self._stage.max:
+            raise exceptions.OutOfRangeError(
+                "Cannot go to position {}".format(target))
+        move = self._planner.plan(self._stage.position, target)
+        waveform = Waveform.compile(move)
+        LOGGER.info("Playing %r for move %s", waveform, move)
+        played = self._player.play(
+            waveform, lambda: self._target is not None)
+        if played < len(waveform):
+            LOGGER.info("Move superseded by request for %s", self._target)
+            with self._condition:
+                self.statistics.cancelled += 1
+        if played:
+            self._stage.calibrate(int(waveform.positions[played - 1]))
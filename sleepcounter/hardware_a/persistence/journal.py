@@ -0,0 +1,220 @@
+"""
+An append-only state journal held in a memory-mapped file. Each state is
+appended as a fixed-size record so that frequent updates only dirty a page in
+memory. Pages are flushed to the disk on an interval or when the journal is
+closed, which coalesces many updates into one write. Records that must not be
+lost are flushed as soon as they are appended. When the journal is full
+it is compacted down to its last record.
+
+module constants:
+MAGIC -- bytes that start every journal file
+VERSION -- the current journal format version
+CAPACITY -- default number of records held before compacting
+FLUSH_INTERVAL -- default seconds between flushes to the disk
+"""
+import logging
+import math
+import mmap
+import os
+import struct
+import zlib
+from collections import namedtuple
+from threading import Lock, Timer
+from time import time
+
+from sleepcounter.hardware_a.persistence.store import write_atomic
+
+LOGGER = logging.getLogger("journal")
+
+MAGIC = b'SLPJ'
+VERSION = 1
+CAPACITY = 127
+FLUSH_INTERVAL = 60
+
+# magic, version, record size, number of records
+_HEADER = struct.Struct('<4sHHI20x')
+# timestamp, total time, position, event id
+_ENTRY = struct.Struct('<ddiI4x')
+_CHECKSUM = struct.Struct('<I')
+_RECORD_SIZE = _ENTRY.size + _CHECKSUM.size
+
+_NO_POSITION = -1
+_NO_EVENT = 0
+
+JournalEntry = namedtuple(
+    'JournalEntry', ['timestamp', 'total_time', 'position', 'event_id'])
+
+
+def id_for_event(event):
+    """Returns a stable id for an event that can be stored in the journal"""
+    if event is None:
+        return _NO_EVENT
+    return zlib.crc32(event.name.encode()) or 1
+
+
+def is_journal(path: str):
+    """Returns True if the file at path starts like a journal"""
+    try:
+        with open(path, 'rb') as fp:
+            return fp.read(len(MAGIC)) == MAGIC
+    except FileNotFoundError:
+        return False
+
+
+class StateJournal:
+    """
+    A journal of fixed-size records in a memory-mapped file. The last record
+    appended is the current state and is found in constant time.
+    """
+    # pylint: disable=too-many-instance-attributes
+    def __init__(
+            self,
+            path: str,
+            capacity=CAPACITY,
+            flush_interval=FLUSH_INTERVAL,
+            clock=time):
+        self.path = path
+        self.capacity = capacity
+        self.flush_interval = flush_interval
+        self._clock = clock
+        self._lock = Lock()
+        self._timer = None
+        self._map = None
+        self._count = 0
+        self.flushes = 0
+        self._open()
+
+    def append(self, total_time, position, event_id, flush=False):
+        """
+        Appends the state to the journal. The total time and position may be
+        None if they are not known. If flush is True the journal is flushed to
+        the disk straight away rather than on the interval.
+        """
+        record = _pack(
+            JournalEntry(self._clock(), total_time, position, event_id))
+        with self._lock:
+            if self._count >= self.capacity:
+                self._compact()
+            offset = _offset(self._count)
+            self._map[offset:offset + _RECORD_SIZE] = record
+            self._count += 1
+            self._write_header()
+            if flush:
+                self._flush()
+            else:
+                self._schedule_flush()
+
+    def last(self):
+        """
+        Returns the last valid entry in the journal or None if it is empty.
+        Records that fail their checksum are skipped.
+        """
+        with self._lock:
+            return self._last()
+
+    def flush(self):
+        """Flushes appended records to the disk"""
+        with self._lock:
+            self._flush()
+
+    def close(self):
+        """Flushes and closes the journal"""
+        with self._lock:
+            self._flush()
+            self._map.close()
+
+    def __len__(self):
+        return self._count
+
+    def _open(self):
+        size = _offset(self.capacity)
+        if not self._is_valid(size):
+            LOGGER.warning("Creating new journal at %s", self.path)
+            write_atomic(self.path, _new_journal(self.capacity))
+        with open(self.path, 'r+b') as fp:
+            self._map = mmap.mmap(fp.fileno(), size)
+        _, _, _, count = _HEADER.unpack_from(self._map)
+        self._count = min(count, self.capacity)
+
+    def _is_valid(self, size):
+        try:
+            if os.path.getsize(self.path) != size:
+                return False
+            with open(self.path, 'rb') as fp:
+                magic, version, record_size, _ = \
+                    _HEADER.unpack(fp.read(_HEADER.size))
+        except (OSError, struct.error):
+            return False
+        return (magic, version, record_size) == (MAGIC, VERSION, _RECORD_SIZE)
+
+    def _last(self):
+        for index in reversed(range(self._count)):
+            offset = _offset(index)
+            entry = self._map[offset:offset + _ENTRY.size]
+            (checksum,) = _CHECKSUM.unpack_from(self._map, offset + _ENTRY.size)
+            if zlib.crc32(entry) == checksum:
+                return _unpack(entry)
+            LOGGER.warning("Skipping damaged journal record %d", index)
+        return None
+
+    def _compact(self):
+        LOGGER.info("Compacting journal %s", self.path)
+        last = self._last()
+        self._map.close()
+        data = bytearray(_new_journal(self.capacity))
+        count = 0
+        if last is not None:
+            data[_offset(0):_offset(1)] = _pack(last)
+            count = 1
+        _HEADER.pack_into(data, 0, MAGIC, VERSION, _RECORD_SIZE, count)
+        write_atomic(self.path, bytes(data))
+        with open(self.path, 'r+b') as fp:
+            self._map = mmap.mmap(fp.fileno(), len(data))
+        self._count = count
+
+    def _write_header(self):
+        _HEADER.pack_into(
+            self._map, 0, MAGIC, VERSION, _RECORD_SIZE, self._count)
+
+    def _schedule_flush(self):
+        if not self.flush_interval:
+            self._flush()
+        elif self._timer is None:
+            self._timer = Timer(self.flush_interval, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._map.closed:
+            self._map.flush()
+            self.flushes += 1
+
+
+def _offset(index):
+    return _HEADER.size + index * _RECORD_SIZE
+
+
+def _new_journal(capacity):
+    header = _HEADER.pack(MAGIC, VERSION, _RECORD_SIZE, 0)
+    return header + bytes(capacity * _RECORD_SIZE)
+
+
+def _pack(entry):
+    packed = _ENTRY.pack(
+        entry.timestamp,
+        math.nan if entry.total_time is None else entry.total_time,
+        _NO_POSITION if entry.position is None else entry.position,
+        entry.event_id)
+    return packed + _CHECKSUM.pack(zlib.crc32(packed))
+
+
+def _unpack(entry):
+    timestamp, total_time, position, event = _ENTRY.unpack(entry)
+    return JournalEntry(
+        timestamp=timestamp,
+        total_time=None if math.isnan(total_time) else total_time,
+        position=None if position == _NO_POSITION else position,
+        event_id=event)
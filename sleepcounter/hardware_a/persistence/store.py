@@ -0,0 +1,156 @@
+"""
+Crash-safe storage of small records on disk. Records are written to a
+temporary file which is flushed to the disk and then renamed over the
+original, so a power cut leaves either the old or the new record but never a
+partial one. Each record has a header holding a format version and a checksum
+of the payload so that damaged files are detected when they are read.
+
+module constants:
+MAGIC -- bytes that start every record
+VERSION -- the current record format version
+"""
+import logging
+import os
+import pickle
+import struct
+import tempfile
+import zlib
+from threading import Lock, Timer
+
+LOGGER = logging.getLogger("store")
+
+MAGIC = b'SLPC'
+VERSION = 1
+# magic, version, payload length, crc32 of payload
+_HEADER = struct.Struct('<4sBII')
+
+
+class CorruptDataError(Exception):
+    """Raised when a stored record fails validation"""
+
+
+def encode(data):
+    """Returns the data serialised into a record"""
+    payload = pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+    header = _HEADER.pack(MAGIC, VERSION, len(payload), zlib.crc32(payload))
+    return header + payload
+
+
+def decode(record: bytes):
+    """
+    Returns the data held in the record. Raises CorruptDataError if the record
+    is truncated, has the wrong checksum or an unknown version.
+    """
+    if not record.startswith(MAGIC):
+        return _decode_legacy(record)
+    if len(record) < _HEADER.size:
+        raise CorruptDataError("Record header is truncated")
+    _, version, length, checksum = _HEADER.unpack_from(record)
+    if version != VERSION:
+        raise CorruptDataError("Unknown record version {}".format(version))
+    payload = record[_HEADER.size:]
+    if len(payload) != length:
+        raise CorruptDataError(
+            "Expected {} bytes of data, got {}".format(length, len(payload)))
+    if zlib.crc32(payload) != checksum:
+        raise CorruptDataError("Record checksum does not match")
+    return pickle.loads(payload)
+
+
+def _decode_legacy(record):
+    # files written before records had a header are a bare pickle, which can
+    # fail in almost any way when it is damaged since it has no checksum
+    try:
+        return pickle.loads(record)
+    except Exception as err: # pylint: disable=broad-except
+        raise CorruptDataError("Could not read legacy record") from err
+
+
+def write_atomic(path: str, data: bytes):
+    """Replaces the contents of the file at path with data atomically"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as fp:
+            fp.write(data)
+            fp.flush()
+            os.fsync(fp.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    _fsync_directory(directory)
+
+
+def _fsync_directory(directory):
+    # make the rename itself durable
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class RecordStore:
+    """
+    Stores a single record in a file. Writes of data identical to what is
+    already stored are skipped. If a write delay is given, writes are held
+    back for that many seconds and only the latest data is written so that
+    bursts of updates cost a single write.
+    """
+    def __init__(self, path: str, write_delay=0.0):
+        self.path = path
+        self.write_delay = write_delay
+        self._lock = Lock()
+        self._written = None
+        self._pending = None
+        self._timer = None
+        self.writes = 0
+
+    def write(self, data):
+        """Stores the data, possibly after the write delay"""
+        record = encode(data)
+        with self._lock:
+            self._pending = record
+            if not self.write_delay:
+                self._flush()
+            elif self._timer is None:
+                self._timer = Timer(self.write_delay, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self):
+        """Writes any pending data now"""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            self._flush()
+
+    def read(self):
+        """
+        Returns the stored data. Raises FileNotFoundError if nothing has been
+        stored or CorruptDataError if the file is damaged.
+        """
+        with self._lock:
+            with open(self.path, 'rb') as fp:
+                record = fp.read()
+            data = decode(record)
+            self._written = record
+            return data
+
+    def _flush(self):
+        record, self._pending = self._pending, None
+        if record is None:
+            return
+        if record == self._written and os.path.exists(self.path):
+            return
+        LOGGER.debug("Writing %d bytes to %s", len(record), self.path)
+        write_atomic(self.path, record)
+        self._written = record
+        self.writes += 1
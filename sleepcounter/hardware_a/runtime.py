@@ -0,0 +1,77 @@
+"""
+An asyncio runtime for the hardware widgets. It takes the place of the core
+Application, which runs every widget in its own thread. Here each widget's
+update_async coroutine is awaited on one event loop every mins_between_updates
+minutes, so display refresh, stage steps and calendar ticks all run together
+on a single thread. A widget that can tell when it next needs updating, like
+the stage widgets, is left alone until then instead.
+
+module constants:
+MIN_INTERVAL -- the least number of seconds between updates of a widget
+MAX_INTERVAL -- the most seconds a widget is left for when it predicts its next
+update, in case the clock is changed
+"""
+import asyncio
+import logging
+
+LOGGER = logging.getLogger("async runtime")
+
+MIN_INTERVAL = 0.01
+MAX_INTERVAL = 60 * 60
+
+
+class AsyncApplication:
+    """
+    Runs widgets on an asyncio event loop. Widgets must have an update_async
+    coroutine and may use an AsyncLedMatrix or AsyncMotionExecutor to do their
+    work on the same loop. They may also have a seconds_to_next_update method
+    returning when they next need updating, or None if they don't know.
+    """
+    def __init__(self, widgets):
+        self._widgets = widgets
+        self._tasks = []
+
+    async def run(self):
+        """
+        Runs the widgets until the application is stopped or the task running
+        it is cancelled. Widgets are stopped when it returns.
+        """
+        loop = asyncio.get_running_loop()
+        self._tasks = [
+            loop.create_task(self._tick(widget)) for widget in self._widgets]
+        try:
+            await asyncio.gather(*self._tasks)
+        except asyncio.CancelledError:
+            LOGGER.info("Application stopped")
+        finally:
+            self.stop()
+            for widget in self._widgets:
+                widget.stop()
+
+    def stop(self):
+        """Stops updating the widgets"""
+        for task in self._tasks:
+            task.cancel()
+
+    @staticmethod
+    async def _tick(widget):
+        while True:
+            try:
+                await widget.update_async()
+            except Exception: # pylint: disable=broad-except
+                LOGGER.exception("Failed to update %r", widget)
+            await asyncio.sleep(_interval(widget))
+
+
+def _interval(widget):
+    """
+    Returns the seconds to wait before updating the widget again. Widgets with
+    a seconds_to_next_update method are updated when they say, otherwise every
+    mins_between_updates minutes.
+    """
+    predict = getattr(widget, 'seconds_to_next_update', None)
+    seconds = predict() if predict is not None else None
+    if seconds is None:
+        return widget.mins_between_updates * 60
+    LOGGER.debug("Next update of %r due in %.1fs", widget, seconds)
+    return min(max(seconds, MIN_INTERVAL), MAX_INTERVAL)
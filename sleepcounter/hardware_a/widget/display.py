@@ -8,46 +8,77 @@ import logging
 from sleepcounter.core.time.calendar import Calendar
 from sleepcounter.core.widget import BaseWidget
 from sleepcounter.hardware_a.display.interface import LedMatrixInterface
+from sleepcounter.hardware_a.display.playlist import Item
+from sleepcounter.hardware_a.widget.sleeps import SleepsCache
 
 LOGGER = logging.getLogger("display widget")
 
+SPECIAL_DAY_PRIORITY = 1
+
 
 class LedMatrixWidget(BaseWidget):
     """
-    Represents the date using an led matrix.
+    Represents the date using an led matrix. The messages last shown are
+    kept so that the display is left alone when they have not changed. If
+    max_events is given only that many of the next events are shown. On a
+    special day only its message is shown. It is given a higher priority so
+    that it pre-empts the messages for the other events still playing.
     """
     # pylint: disable=too-few-public-methods
     def __init__(
             self,
             display: LedMatrixInterface,
             calendar: Calendar,
-            label=None):
+            label=None,
+            max_events=None):
         self._display = display
+        self._messages = None
+        self._sleeps = SleepsCache(calendar)
+        self.max_events = max_events
         super().__init__(calendar, label)
 
+    async def update_async(self):
+        """
+        Coroutine that updates the display for the asyncio runtime. The display
+        should be an AsyncLedMatrix so that messages are shown by a task on the
+        same event loop.
+        """
+        self.update()
+
     def update(self):
-        """Updates the display using data from the current calendar instance"""
-        self._display.clear()
+        """
+        Updates the display using data from the current calendar instance. The
+        display is only updated if the messages have changed.
+        """
         if self._calendar.special_day_today:
-            self._handle_special_day()
+            # the special day message would never give the others a turn
+            messages = self._special_day_messages()
         else:
-            self._handle_regular_day()
+            messages = self._regular_day_messages()
+        if messages == self._messages:
+            LOGGER.debug("Messages unchanged. Not updating display")
+            return
+        LOGGER.info("Displaying...%s", messages)
+        self._display.show_messages(messages)
+        # only kept once shown so that a failure is retried on the next update
+        self._messages = messages
 
-    def _handle_special_day(self):
+    def _special_day_messages(self):
         to_display = "It's {}!".format(self._calendar.todays_event.name)
-        LOGGER.info(
+        LOGGER.debug(
             "Updating with calendar %s. Setting message to <%s>",
             self._calendar,
             to_display,
         )
-        self._display.show_messages([to_display])
+        return [Item(to_display, priority=SPECIAL_DAY_PRIORITY)]
 
-    def _handle_regular_day(self):
+    def _regular_day_messages(self):
         to_display = []
-        for event in self._calendar.events:
-            n_sleeps = self._calendar.sleeps_to_event(event)
+        for event, n_sleeps in self._sleeps.next_events(self.max_events):
+            if n_sleeps < 1:
+                # today's event is shown as a special day message
+                continue
             unit = 'sleeps' if n_sleeps > 1 else 'sleep'
             to_display.append(
                 "{} in {} {} . . . ".format(event.name, n_sleeps, unit))
-        LOGGER.info("Displaying...%s", to_display)
-        self._display.show_messages(to_display)
+        return to_display
@@ -0,0 +1,54 @@
+"""
+A cache of the number of sleeps to every event in a calendar. Working the
+sleeps out for each event on every update is wasteful for diaries holding
+hundreds of events since the counts only change once a day. Here they are
+worked out together once per calendar day and kept in order of the sleeps
+remaining so that the next events are taken from the front.
+"""
+import logging
+
+LOGGER = logging.getLogger("sleeps cache")
+
+
+class SleepsCache:
+    """
+    Holds the sleeps to each event in a calendar for the current calendar day.
+    The day is left to the calendar, which decides when a sleep has passed, by
+    checking whether the sleeps to the first event have changed. So each query
+    costs one sleeps calculation unless the day has changed.
+    """
+    def __init__(self, calendar):
+        """Creates an empty cache for the calendar"""
+        self._calendar = calendar
+        self._counts = []
+        self._probe = None
+        self.rebuilds = 0
+
+    def next_events(self, count=None):
+        """
+        Returns a list of (event, sleeps) for the next count events in the
+        calendar, or all of the events if count is None, soonest first
+        """
+        if not self._is_current():
+            self._rebuild()
+        return self._counts[:count]
+
+    def invalidate(self):
+        """Forgets the counts so they are worked out again on the next query"""
+        self._probe = None
+
+    def _is_current(self):
+        if self._probe is None:
+            return False
+        event, sleeps = self._probe
+        return self._calendar.sleeps_to_event(event) == sleeps
+
+    def _rebuild(self):
+        counts = [
+            (event, self._calendar.sleeps_to_event(event))
+            for event in self._calendar.events]
+        counts.sort(key=lambda count: count[1])
+        self._counts = counts
+        self._probe = counts[0] if counts else None
+        self.rebuilds += 1
+        LOGGER.info("Counted sleeps to %d events", len(counts))
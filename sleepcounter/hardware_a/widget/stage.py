@@ -2,15 +2,27 @@
 sleeps to the next event in therms of the distance from the end of the track"""
 # pylint: disable=invalid-name
 import logging
-import pickle
+import math
 
 from sleepcounter.core.widget import BaseWidget
+from sleepcounter.hardware_a.motion.executor import MotionExecutor
+from sleepcounter.hardware_a.persistence.journal import (
+    FLUSH_INTERVAL,
+    StateJournal,
+    id_for_event,
+    is_journal)
+from sleepcounter.hardware_a.persistence.store import (
+    CorruptDataError,
+    RecordStore)
 
 LOGGER = logging.getLogger("stage widget")
 
 DEFAULT_RECOVERY_PATH = '/var/tmp/'
 DEFAULT_FILENAME = 'sleepcounter.tmp'
 DEFAULT_RECOVERY_FILE = DEFAULT_RECOVERY_PATH + DEFAULT_FILENAME
+# sleeps pass at bedtime so there is at least a day between them, less an hour
+# in case the clocks go forward
+MIN_SECONDS_BETWEEN_SLEEPS = 23 * 60 * 60
 
 
 class RecoveryData:
@@ -18,17 +30,26 @@ class RecoveryData:
     Recovers data from a file. Attributes written to the instance will be rec-
     orded to the file. When the instance is created, the same attributes are
     read from the file and overwritten if set again.
+
+    Files are replaced atomically and carry a checksum so a power cut can never
+    leave a partially written file behind. Repeated records of the same data
+    are not written and, if write_delay is given, records made within that many
+    seconds of each other are coalesced into one write.
     """
-    def __init__(self, file: str):
+    def __init__(self, file: str, write_delay=0.0):
         """Create an instance using the filename specified."""
         self._file = file
+        self._store = RecordStore(file, write_delay)
         LOGGER.info("instantiating %s with file %s", self, self._file)
 
     def record(self, data):
         """serialise the data and save to file"""
-        with open(self._file, 'wb') as fp:
-            LOGGER.info("Writing %s to file %s", data, self._file)
-            pickle.dump(data, fp)
+        LOGGER.info("Writing %s to file %s", data, self._file)
+        self._store.write(data)
+
+    def flush(self):
+        """write any data that is waiting to be saved"""
+        self._store.flush()
 
     def recover(self):
         """recover data from the file"""
@@ -37,82 +58,266 @@ class RecoveryData:
             contents = self._read()
         except FileNotFoundError:
             LOGGER.warning("No recovery data found.")
+        except CorruptDataError as err:
+            LOGGER.warning("Recovery data is corrupt: %s", err)
         return contents
 
     def _read(self):
         LOGGER.info("Getting saved data...")
-        with open(self._file, 'rb') as fp:
-            contents = pickle.load(fp)
-            LOGGER.info("Read %r from file", contents)
-            return contents
+        contents = self._store.read()
+        LOGGER.info("Read %r from file", contents)
+        return contents
+
+
+class RecoveryJournal:
+    """
+    Recovers data from a memory-mapped journal file. It is used in the same way
+    as RecoveryData but records are appended to the journal in memory and only
+    flushed to the file every flush_interval seconds, so recording often does
+    not wear out the disk. Data is recorded as (total_time, next_event,
+    position) and the event is looked up in the calendar when recovered.
+    """
+    def __init__(self, file: str, calendar, flush_interval=FLUSH_INTERVAL):
+        """Create an instance using the filename specified."""
+        self._file = file
+        self._calendar = calendar
+        self._legacy = None
+        if not is_journal(file):
+            # data recorded before the journal was used is carried over
+            self._legacy = RecoveryData(file).recover()
+        self._journal = StateJournal(file, flush_interval=flush_interval)
+        LOGGER.info("instantiating %s with file %s", self, self._file)
+
+    def record(self, data):
+        """append the data to the journal"""
+        total_time, next_event, position = data
+        LOGGER.debug("Journalling %s to file %s", data, self._file)
+        # the stage starting to move must reach the disk before it moves, so
+        # that it is homed if the power is cut part way through the move
+        self._journal.append(
+            total_time,
+            position,
+            id_for_event(next_event),
+            flush=position is None)
+
+    def flush(self):
+        """write journalled data to the file"""
+        self._journal.flush()
+
+    def recover(self):
+        """recover the last data recorded in the journal"""
+        entry = self._journal.last()
+        if entry is None:
+            if self._legacy is None:
+                LOGGER.warning("No recovery data found.")
+            return self._legacy
+        contents = (
+            entry.total_time,
+            self._find_event(entry.event_id),
+            entry.position,
+        )
+        LOGGER.info("Read %r from journal", contents)
+        return contents
+
+    def _find_event(self, event_id):
+        for event in self._calendar.events:
+            if id_for_event(event) == event_id:
+                return event
+        return None
 
 
 class StageWidgetBase(BaseWidget):
     # pylint: disable=too-few-public-methods
     """
     Represents the date using a linear translation stage. The stage moves along
-    as the date nears an important event.
+    as the date nears an important event. Moves are made in the background by a
+    motion executor so that updates return straight away.
+
+    The position the stage comes to rest at is recorded with the recovery data.
+    On restart, the stage is told its recorded position instead of being homed
+    unless the data is missing, stale or corrupt. Recovery data is kept in a
+    RecoveryJournal unless another recovery object is given.
+
+    The executor is the class of motion executor used to move the stage. Pass
+    AsyncMotionExecutor to run the widget with the asyncio runtime, or a
+    StageArbiter to share the stage with other widgets.
+
+    A move is only requested when the whole step the stage should be at has
+    changed. seconds_to_next_update works out when that will next happen so
+    that the widget need not be woken before then.
     """
     units = None
+    home_position = 0
 
     def __init__(
             self,
             stage,
             calendar,
             label=None,
-            recovery_file=DEFAULT_RECOVERY_FILE):
+            recovery_file=DEFAULT_RECOVERY_FILE,
+            planner=None,
+            recovery=None,
+            executor=MotionExecutor):
+        # pylint: disable=too-many-arguments
         super().__init__(calendar, label)
-        self._persistent_data = RecoveryData(recovery_file)
-        recovered = self._persistent_data.recover()
-        if recovered is None:
-            self._total_time = None
-            self._next_event = None
-        else:
-            self._total_time, self._next_event = recovered
-            LOGGER.info(
-                "Counting %r %s to event %s in total",
-                self._total_time,
-                self.units,
-                self._next_event)
+        if recovery is None:
+            recovery = RecoveryJournal(recovery_file, calendar)
+        self._persistent_data = recovery
+        self._total_time = None
+        self._next_event = None
+        self._position = None
+        self._requested = None
+        self._restore(self._persistent_data.recover())
         self._stage = stage
-        self._stage.home()
+        self._motion = executor(
+            stage, planner, on_position=self._on_position)
+        if self._can_resume():
+            LOGGER.info("Resuming stage from position %d", self._position)
+            self._stage.calibrate(self._position)
+        else:
+            LOGGER.info("Stage position unknown. Homing stage")
+            self._position = None
+            self._home()
+
+    def stop(self):
+        """Stops updating the widget, saving any pending recovery data"""
+        super().stop()
+        self._persistent_data.flush()
+
+    async def update_async(self):
+        """
+        Coroutine that updates the widget for the asyncio runtime. Moves are
+        requested of the motion executor, so it returns without waiting for the
+        stage.
+        """
+        self.update()
 
     def update(self):
         """
         Update the position of the stage based on the time to the event. If
-        today is a special day, then restart the timer and don't move. Otherwise
-        go home and scale the position based on the time remaining to the event.
+        today is a special day, then restart the timer and move to the end.
+        Otherwise go home and scale the position based on the time remaining to
+        the event.
         """
         LOGGER.info("Updating with calendar %s", self._calendar)
         if self._calendar.special_day_today:
             LOGGER.info("Today is a special day. Moving stage to end position")
             self._total_time = None
-            self._stage.end()
+            self._move_to(self._stage.max)
         else:
             time_to_event = self._get_time_to_next_event()
             if (self._total_time is None
                     or self._calendar.next_event != self._next_event):
-                LOGGER.info("Setting initial time. Homing stage")
+                LOGGER.info("Setting initial time. Moving stage home")
                 self._next_event = self._calendar.next_event
                 self._total_time = time_to_event
-                self._stage.home()
-                self._persistent_data.record(
-                    (self._total_time, self._next_event,))
+                self._move_to(self.home_position)
+                self._record()
             else:
-                time_done = \
-                    (self._total_time - time_to_event)
-                pos = int(time_done / self._total_time * self._stage.max)
+                pos = self._position_for(time_to_event)
                 LOGGER.info(
                     "%r %s to next event. Updating position to %d",
                     time_to_event,
                     self.units,
                     pos,
                 )
-                self._stage.position = pos
+                self._move_to(pos)
+
+    def seconds_to_next_update(self):
+        """
+        Returns the number of seconds until the stage should next move a whole
+        step, or None if that cannot be worked out and the widget should be
+        updated at its usual interval
+        """
+        if self._total_time is None or self._calendar.special_day_today:
+            return None
+        time_to_event = self._get_time_to_next_event()
+        pos = self._position_for(time_to_event)
+        if pos >= self._stage.max:
+            return None
+        # the time to the event when the stage reaches the next step
+        time_at_step = self._total_time * (1 - (pos + 1) / self._stage.max)
+        return self._seconds_until(time_to_event - time_at_step)
+
+    def _position_for(self, time_to_event):
+        time_done = self._total_time - time_to_event
+        return int(time_done / self._total_time * self._stage.max)
+
+    def _move_to(self, position):
+        if position == self._requested:
+            LOGGER.debug("Stage already sent to %d", position)
+            return
+        self._requested = position
+        self._motion.move_to(position)
+
+    def _home(self):
+        """
+        Homes the stage through the executor, so that it can't be moving for
+        another widget sharing it, and waits for it to finish
+        """
+        home = getattr(self._motion, 'home', None)
+        if home is None:
+            # executors without a home command drive only this widget's stage
+            self._stage.home()
+            return
+        home()
+        self._motion.wait()
+
+    def _restore(self, recovered):
+        if recovered is None:
+            return
+        try:
+            if len(recovered) == 2:
+                self._total_time, self._next_event = recovered
+            else:
+                self._total_time, self._next_event, self._position = recovered
+        except (TypeError, ValueError):
+            LOGGER.warning("Ignoring invalid recovery data %r", recovered)
+            self._total_time = None
+            self._next_event = None
+            self._position = None
+            return
+        LOGGER.info(
+            "Counting %r %s to event %s in total",
+            self._total_time,
+            self.units,
+            self._next_event)
+
+    def _can_resume(self):
+        if not isinstance(self._position, int):
+            return False
+        if not 0 <= self._position <= self._stage.max:
+            LOGGER.warning("Recovered position %r out of range", self._position)
+            return False
+        if self._next_event != self._calendar.next_event:
+            LOGGER.info("Recovered data for %s is stale", self._next_event)
+            return False
+        if not hasattr(self._stage, 'calibrate'):
+            LOGGER.info("Stage %r cannot be told its position", self._stage)
+            return False
+        return True
+
+    def _on_position(self, position):
+        if position is not None and position != self._requested:
+            # another widget sharing the stage has moved it
+            self._requested = None
+        self._position = position
+        self._record()
+
+    def _record(self):
+        self._persistent_data.record(
+            (self._total_time, self._next_event, self._position,))
 
     def _get_time_to_next_event(self):
         raise NotImplementedError
 
+    def _seconds_until(self, time):
+        """
+        Returns the least number of seconds it will take for time in the
+        widget's units to pass, or None if it can't be known
+        """
+        raise NotImplementedError
+
 
 class SecondsStageWidget(StageWidgetBase):
     # pylint: disable=too-few-public-methods
@@ -125,6 +330,9 @@ class SecondsStageWidget(StageWidgetBase):
     def _get_time_to_next_event(self):
         return self._calendar.seconds_to_next_event
 
+    def _seconds_until(self, time):
+        return time
+
 
 class SleepsStageWidget(StageWidgetBase):
     # pylint: disable=too-few-public-methods
@@ -136,3 +344,11 @@ class SleepsStageWidget(StageWidgetBase):
 
     def _get_time_to_next_event(self):
         return self._calendar.sleeps_to_next_event
+
+    def _seconds_until(self, time):
+        # the calendar decides when each sleep passes, so only the sleeps
+        # after the next one are known to take at least a day
+        sleeps = math.ceil(time)
+        if sleeps <= 1:
+            return None
+        return (sleeps - 1) * MIN_SECONDS_BETWEEN_SLEEPS
@@ -0,0 +1,97 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from sleepcounter.hardware_a.display.display import _Message
+from sleepcounter.hardware_a.display.framediff import FrameDiffDevice
+from sleepcounter.hardware_a.mocks import Matrix
+
+BYTES_PER_FRAME = 8 * 2 * 4
+
+
+def _pattern(size):
+    image = Image.new("1", size)
+    draw = ImageDraw.Draw(image)
+    draw.rectangle((1, 1, 12, 3), fill="white")
+    draw.line((20, 0, 28, 7), fill="white")
+    return image
+
+
+class EmulatedMax7219Tests(unittest.TestCase):
+
+    def setUp(self):
+        self.device = Matrix()
+        self.device.spi.reset_counters()
+
+    def test_has_device_dimensions(self):
+        self.assertEqual((32, 8), self.device.size)
+        self.assertEqual("1", self.device.mode)
+
+    def test_framebuffer_shows_displayed_image(self):
+        image = _pattern(self.device.size)
+        self.device.display(image)
+        np.testing.assert_array_equal(
+            np.asarray(image), self.device.framebuffer)
+
+    def test_counts_bytes_sent(self):
+        self.device.display(_pattern(self.device.size))
+        self.assertEqual(8, self.device.spi.transactions)
+        self.assertEqual(BYTES_PER_FRAME, self.device.spi.bytes_sent)
+
+    def test_clear_blanks_framebuffer(self):
+        self.device.display(_pattern(self.device.size))
+        self.device.clear()
+        self.assertFalse(self.device.framebuffer.any())
+
+    def test_frames_recorded_through_frame_diff(self):
+        diff = FrameDiffDevice(self.device)
+        message = _Message("Hello", scroll=True)
+        self.device.recording = True
+        sent = []
+        for start in range(10):
+            window = message.window(self.device, start)
+            diff.display(window)
+            # frames the same as the one before are skipped
+            if diff.frames_sent > len(sent):
+                sent.append(window)
+        self.assertEqual(diff.frames_sent, len(self.device.frames))
+        for window, frame in zip(sent, self.device.frames):
+            np.testing.assert_array_equal(
+                np.asarray(window), np.asarray(frame))
+        self.assertLess(self.device.spi.bytes_sent, 10 * BYTES_PER_FRAME)
+
+    def test_frames_with_few_changed_digits_recorded_apart(self):
+        diff = FrameDiffDevice(self.device)
+        registers = np.zeros((8, 4), np.uint8)
+        diff.display_registers(registers)
+        self.device.recording = True
+        # the second frame only writes digits above those of the first
+        for digits in ([2, 3], [5]):
+            registers = registers.copy()
+            registers[digits] = 0xff
+            diff.display_registers(registers)
+        self.assertEqual(2, len(self.device.frames))
+        self.assertEqual(3, diff.frames_sent)
+
+    def test_display_records_each_frame(self):
+        self.device.recording = True
+        self.device.display(_pattern(self.device.size))
+        self.device.clear()
+        self.assertEqual(2, len(self.device.frames))
+        np.testing.assert_array_equal(
+            np.asarray(_pattern(self.device.size)),
+            np.asarray(self.device.frames[0]))
+
+    def test_saves_images(self):
+        self.device.display(_pattern(self.device.size))
+        self.device.capture()
+        with tempfile.TemporaryDirectory() as directory:
+            png = os.path.join(directory, 'frame.png')
+            gif = os.path.join(directory, 'frames.gif')
+            self.device.save_png(png)
+            self.device.save_gif(gif)
+            self.assertTrue(os.path.getsize(png))
+            self.assertTrue(os.path.getsize(gif))
@@ -0,0 +1,63 @@
+import unittest
+from unittest.mock import Mock
+
+from PIL import Image, ImageDraw
+
+from luma.led_matrix.device import max7219
+
+from sleepcounter.hardware_a.display.framediff import FrameDiffDevice
+
+CASCADED = 4
+
+
+class FrameDiffDeviceTests(unittest.TestCase):
+
+    def setUp(self):
+        self.serial = Mock()
+        self.device = max7219(
+            self.serial, cascaded=CASCADED, block_orientation=-90, rotate=2)
+        self.diff = FrameDiffDevice(self.device)
+        self.serial.reset_mock()
+
+    def _blank(self):
+        return Image.new(self.diff.mode, self.diff.size)
+
+    def test_first_frame_is_written_in_full(self):
+        self.diff.display(self._blank())
+        self.assertEqual(8, self.serial.data.call_count)
+
+    def test_identical_frame_is_skipped(self):
+        self.diff.display(self._blank())
+        self.serial.reset_mock()
+        self.diff.display(self._blank())
+        self.serial.data.assert_not_called()
+        self.assertEqual(1, self.diff.frames_skipped)
+
+    def test_only_changed_digits_are_written(self):
+        self.diff.display(self._blank())
+        self.serial.reset_mock()
+        image = self._blank()
+        image.putpixel((0, 0), 1)
+        self.diff.display(image)
+        self.assertEqual(1, self.serial.data.call_count)
+
+    def test_written_frame_matches_device(self):
+        image = self._blank()
+        ImageDraw.Draw(image).rectangle((3, 1, 20, 5), fill="white")
+        self.device.display(image)
+        expected = [args[0] for args, _ in self.serial.data.call_args_list]
+        self.serial.reset_mock()
+        self.diff.display(image)
+        actual = [args[0] for args, _ in self.serial.data.call_args_list]
+        self.assertEqual(expected, actual)
+
+    def test_clear_forces_full_write(self):
+        self.diff.display(self._blank())
+        self.diff.clear()
+        self.serial.reset_mock()
+        self.diff.display(self._blank())
+        self.assertEqual(8, self.serial.data.call_count)
+
+    def test_delegates_to_device(self):
+        self.assertEqual(self.device.width, self.diff.width)
+        self.assertEqual(self.device.height, self.diff.height)
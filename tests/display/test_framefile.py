@@ -0,0 +1,67 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from sleepcounter.hardware_a.display.framefile import FrameFile, make_key
+
+FRAME_SHAPE = (8, 8)
+KEY = make_key(b'playlist')
+
+
+def _sequences():
+    scroll = np.arange(3 * 64, dtype=np.uint8).reshape((3,) + FRAME_SHAPE)
+    static = np.full((1,) + FRAME_SHAPE, 7, dtype=np.uint8)
+    return [scroll, static]
+
+
+class FrameFileTests(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'frames')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_frames_read_back_as_compiled(self):
+        frames = FrameFile.compile(self.path, KEY, _sequences())
+        self.assertEqual(2, len(frames))
+        for expected, actual in zip(_sequences(), (frames[0], frames[1])):
+            np.testing.assert_array_equal(expected, actual)
+
+    def test_frames_held_in_memory_without_path(self):
+        frames = FrameFile.compile(None, KEY, _sequences())
+        np.testing.assert_array_equal(_sequences()[1], frames[1])
+
+    def test_load_reuses_file_with_same_key(self):
+        FrameFile.compile(self.path, KEY, _sequences()).close()
+        frames = FrameFile.load(self.path, KEY, FRAME_SHAPE)
+        self.assertIsNotNone(frames)
+        np.testing.assert_array_equal(_sequences()[0], frames[0])
+
+    def test_load_ignores_file_with_other_key(self):
+        FrameFile.compile(self.path, KEY, _sequences()).close()
+        self.assertIsNone(
+            FrameFile.load(self.path, make_key(b'other'), FRAME_SHAPE))
+
+    def test_load_ignores_truncated_file(self):
+        FrameFile.compile(self.path, KEY, _sequences()).close()
+        with open(self.path, 'r+b') as fp:
+            fp.truncate(os.path.getsize(self.path) - 1)
+        self.assertIsNone(FrameFile.load(self.path, KEY, FRAME_SHAPE))
+
+    def test_load_without_file(self):
+        self.assertIsNone(FrameFile.load(self.path, KEY, FRAME_SHAPE))
+
+    def test_frames_are_views_of_the_mapping(self):
+        frames = FrameFile.compile(self.path, KEY, _sequences())
+        self.assertFalse(frames[0].flags.owndata)
+        self.assertFalse(frames[0].flags.writeable)
+
+    def test_close_while_frames_in_use(self):
+        frames = FrameFile.compile(self.path, KEY, _sequences())
+        scroll = frames[0]
+        frames.close()
+        np.testing.assert_array_equal(_sequences()[0], scroll)
@@ -0,0 +1,213 @@
+import os
+import tempfile
+from time import monotonic, sleep
+import unittest
+from unittest.mock import Mock, patch
+
+from luma.led_matrix.device import max7219
+
+from sleepcounter.hardware_a.display.display import LedMatrix, _Message
+from sleepcounter.hardware_a.display.playlist import Item
+
+DEVICE_WIDTH = 32
+DEVICE_HEIGHT = 8
+WORKER_WAIT_SEC = 0.5
+
+
+def _make_device():
+    device = Mock()
+    device.width = DEVICE_WIDTH
+    device.height = DEVICE_HEIGHT
+    device.mode = "1"
+    return device
+
+
+class MessageStripTests(unittest.TestCase):
+
+    def setUp(self):
+        self.device = _make_device()
+        self.message = _Message("Christmas in 2 sleeps", scroll=False)
+
+    def test_strip_is_message_length_plus_device_width(self):
+        strip = self.message.strip(self.device)
+        self.assertEqual(
+            (self.message.length + DEVICE_WIDTH, DEVICE_HEIGHT),
+            strip.size)
+        self.assertEqual("1", strip.mode)
+
+    def test_strip_is_only_rendered_once(self):
+        first = self.message.strip(self.device)
+        second = self.message.strip(self.device)
+        self.assertIs(first, second)
+
+    def test_window_is_device_sized(self):
+        window = self.message.window(self.device, DEVICE_WIDTH)
+        self.assertEqual((DEVICE_WIDTH, DEVICE_HEIGHT), window.size)
+
+    def test_first_window_is_blank(self):
+        window = self.message.window(self.device, 0)
+        self.assertIsNone(window.getbbox())
+
+    def test_window_past_the_end_of_the_strip_is_blank(self):
+        start = self.message.length + DEVICE_WIDTH
+        window = self.message.window(self.device, start)
+        self.assertIsNone(window.getbbox())
+
+    def test_window_at_device_width_shows_text(self):
+        window = self.message.window(self.device, DEVICE_WIDTH)
+        self.assertIsNotNone(window.getbbox())
+
+
+class LedMatrixWorkerTests(unittest.TestCase):
+
+    def setUp(self):
+        self.serial = Mock()
+        self.matrix = LedMatrix(
+            max7219(self.serial, cascaded=4, block_orientation=-90, rotate=2),
+            dwell=WORKER_WAIT_SEC / 10)
+
+    def tearDown(self):
+        self.matrix.clear()
+
+    def test_lone_static_message_is_drawn_once(self):
+        self.matrix.show_messages(["Hi"])
+        sleep(WORKER_WAIT_SEC)
+        self.assertEqual(1, self.matrix.device.frames_sent)
+        self.assertEqual(0, self.matrix.device.frames_skipped)
+
+    def test_static_messages_dwell_in_turn(self):
+        self.matrix.show_messages(["Hi", "Bye"])
+        sleep(WORKER_WAIT_SEC)
+        self.assertGreater(self.matrix.device.frames_sent, 2)
+        self.assertLess(self.matrix.device.frames_sent, 20)
+
+    def test_clear_does_not_wait_for_dwell(self):
+        self.matrix.show_messages(["Hi", "Bye"], dwell=60)
+        sleep(WORKER_WAIT_SEC / 10)
+        started = monotonic()
+        self.matrix.clear()
+        self.assertLess(monotonic() - started, WORKER_WAIT_SEC)
+
+    def test_clear_does_not_wait_for_scroll(self):
+        matrix = LedMatrix(
+            max7219(self.serial, cascaded=4, block_orientation=-90, rotate=2),
+            scroll_rate=1)
+        matrix.show_messages(["Christmas in 2 sleeps"])
+        sleep(WORKER_WAIT_SEC / 10)
+        started = monotonic()
+        matrix.clear()
+        self.assertLess(monotonic() - started, WORKER_WAIT_SEC / 5)
+
+    def test_nothing_drawn_after_clear(self):
+        self.matrix.show_messages(["Christmas in 2 sleeps"], scroll=True)
+        sleep(WORKER_WAIT_SEC / 10)
+        self.matrix.clear()
+        frames_sent = self.matrix.device.frames_sent
+        sleep(WORKER_WAIT_SEC / 5)
+        self.assertEqual(frames_sent, self.matrix.device.frames_sent)
+
+    def test_new_messages_reuse_worker_thread(self):
+        self.matrix.show_messages(["Hi"])
+        sleep(WORKER_WAIT_SEC / 10)
+        thread = self.matrix._worker._thread
+        self.matrix.show_messages(["Bye"])
+        sleep(WORKER_WAIT_SEC / 10)
+        self.assertIs(thread, self.matrix._worker._thread)
+        self.assertTrue(thread.is_alive())
+
+    def test_new_messages_do_not_clear_display(self):
+        self.matrix.show_messages(["Hi", "Bye"])
+        sleep(WORKER_WAIT_SEC / 10)
+        with patch.object(self.matrix.device, 'clear') as clear:
+            self.matrix.show_messages(["Hi", "Ciao"])
+        clear.assert_not_called()
+
+    def test_unchanged_messages_are_not_rendered_again(self):
+        self.matrix.show_messages(["Christmas in 2 sleeps", "Hi"])
+        with patch.object(
+                _Message, 'frames', autospec=True,
+                side_effect=_Message.frames) as frames:
+            self.matrix.show_messages(["Christmas in 2 sleeps", "Bye"])
+        self.assertEqual(1, frames.call_count)
+        (message, _), _ = frames.call_args
+        self.assertEqual("BYE", message.text)
+
+    def test_unchanged_scroll_carries_on(self):
+        self.matrix.show_messages(["Christmas in 2 sleeps", "Hi"])
+        sleep(WORKER_WAIT_SEC / 2)
+        self.matrix._worker.stop()
+        index, frame = self.matrix._position
+        self.assertEqual(0, index)
+        self.matrix.show_messages(["Christmas in 2 sleeps", "Bye"])
+        self.assertEqual((0, frame), self.matrix._position)
+
+    def test_changed_scroll_starts_again(self):
+        self.matrix.show_messages(["Christmas in 2 sleeps", "Hi"])
+        sleep(WORKER_WAIT_SEC / 2)
+        self.matrix.show_messages(["Christmas in 1 sleep", "Hi"])
+        self.assertEqual((0, 0), self.matrix._position)
+
+    def test_important_message_pre_empts(self):
+        self.matrix.show_messages(["Christmas in 2 sleeps", "Hi"])
+        sleep(WORKER_WAIT_SEC / 5)
+        self.matrix.show_messages(
+            ["Christmas in 2 sleeps", "Hi", Item("Wow", priority=1)])
+        sleep(WORKER_WAIT_SEC / 10)
+        self.assertEqual((2, 0), self.matrix._position)
+
+    def test_repeated_message_is_shown_then_gives_way(self):
+        bye = Item("Bye", priority=1, repeat=1, dwell=WORKER_WAIT_SEC / 5)
+        self.matrix.show_messages(["Hi", bye])
+        sleep(WORKER_WAIT_SEC / 10)
+        self.assertEqual((1, 0), self.matrix._position)
+        sleep(WORKER_WAIT_SEC / 5)
+        self.assertEqual((0, 0), self.matrix._position)
+
+    def test_interrupted_message_takes_one_turn_after_splice(self):
+        with patch.object(self.matrix._worker, 'start'):
+            self.matrix.show_messages(["A", "B", "C"])
+            # interrupted part way through the first message
+            self.matrix._position = (0, 0)
+            self.matrix.show_messages(["A", "B", "C", "D"])
+        # run the playlist here rather than in the worker
+        self.matrix._worker._wake.clear()
+        shown = []
+        for _ in zip(range(6), self.matrix._playlist()):
+            shown.append(self.matrix._position[0])
+        self.assertEqual([0, 1, 2, 3, 0, 1], shown)
+
+    def test_blank_once_every_message_expires(self):
+        self.matrix.show_messages([Item("Hi", expires_in=WORKER_WAIT_SEC / 5)])
+        sleep(WORKER_WAIT_SEC / 10)
+        self.assertEqual(1, self.matrix.device.frames_sent)
+        with patch.object(self.matrix.device, 'clear') as clear:
+            sleep(WORKER_WAIT_SEC / 2)
+        clear.assert_called_once_with()
+
+
+class LedMatrixFrameFileTests(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'frames')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _show(self, messages):
+        matrix = LedMatrix(
+            max7219(Mock(), cascaded=4, block_orientation=-90, rotate=2),
+            frame_file=self.path)
+        matrix.show_messages(messages)
+        matrix.clear()
+        return os.stat(self.path)
+
+    def test_same_messages_reuse_compiled_frames(self):
+        first = self._show(["Christmas in 2 sleeps", "Hi"])
+        second = self._show(["Christmas in 2 sleeps", "Hi"])
+        self.assertEqual(first.st_ino, second.st_ino)
+
+    def test_new_messages_are_compiled(self):
+        first = self._show(["Christmas in 2 sleeps"])
+        second = self._show(["Christmas in 1 sleep"])
+        self.assertNotEqual(first.st_ino, second.st_ino)
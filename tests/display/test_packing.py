@@ -0,0 +1,50 @@
+import unittest
+from unittest.mock import Mock
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from luma.led_matrix.device import max7219
+
+from sleepcounter.hardware_a.display.display import _Message
+from sleepcounter.hardware_a.display.packing import FramePacker
+
+
+def _pattern(size):
+    image = Image.new("1", size)
+    draw = ImageDraw.Draw(image)
+    draw.rectangle((1, 1, 12, 3), fill="white")
+    draw.line((20, 0, 28, 7), fill="white")
+    return image
+
+
+class FramePackerTests(unittest.TestCase):
+
+    def setUp(self):
+        self.serial = Mock()
+        self.device = max7219(
+            self.serial, cascaded=4, block_orientation=-90, rotate=2)
+        self.packer = FramePacker(self.device)
+        self.serial.reset_mock()
+
+    def test_transactions_match_device(self):
+        image = _pattern(self.device.size)
+        self.device.display(image)
+        expected = [args[0] for args, _ in self.serial.data.call_args_list]
+        registers = self.packer.pack(image)
+        actual = self.packer.transactions(registers).tolist()
+        self.assertEqual(expected, actual)
+
+    def test_strip_windows_match_single_frames(self):
+        message = _Message("Hello", scroll=True)
+        strip = message.strip(self.device)
+        starts = range(message.length + self.device.width + 1)
+        registers = self.packer.pack_strip(strip, starts)
+        for start in starts:
+            expected = self.packer.pack(message.window(self.device, start))
+            np.testing.assert_array_equal(expected, registers[start])
+
+    def test_blank_frame_packs_to_zeros(self):
+        registers = self.packer.pack(Image.new("1", self.device.size))
+        self.assertFalse(registers.any())
+        self.assertEqual((8, 4), registers.shape)
@@ -0,0 +1,88 @@
+import unittest
+
+from sleepcounter.hardware_a.display.playlist import Item, Playlist
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class PlaylistTests(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.playlist = Playlist(clock=self.clock)
+
+    def _keys(self, count):
+        return [self.playlist.next().key for _ in range(count)]
+
+    def test_same_priority_takes_turns(self):
+        for key in 'abc':
+            self.playlist.add(key)
+        self.assertEqual(list('abcabca'), self._keys(7))
+
+    def test_higher_priority_pre_empts(self):
+        self.playlist.add('a')
+        self.playlist.add('b')
+        self.playlist.add('special', priority=1)
+        self.assertEqual(['special'] * 3, self._keys(3))
+
+    def test_repeated_entry_gives_way(self):
+        self.playlist.add('a')
+        self.playlist.add('special', priority=1, repeat=2)
+        self.assertEqual(['special', 'special', 'a', 'a'], self._keys(4))
+
+    def test_expired_entry_gives_way(self):
+        self.playlist.add('a')
+        self.playlist.add('special', priority=1, expires_in=10)
+        self.assertEqual(['special'], self._keys(1))
+        self.clock.now = 10
+        self.assertEqual(['a', 'a'], self._keys(2))
+
+    def test_time_left(self):
+        entry = self.playlist.add('a', expires_in=10)
+        self.clock.now = 4
+        self.assertEqual(6, self.playlist.time_left(entry))
+        self.assertIsNone(self.playlist.time_left(self.playlist.add('b')))
+
+    def test_nothing_left_to_show(self):
+        self.playlist.add('a', repeat=1)
+        self.assertEqual(['a'], self._keys(1))
+        self.assertIsNone(self.playlist.next())
+        self.assertIsNone(self.playlist.peek())
+
+    def test_peek_does_not_count_as_shown(self):
+        self.playlist.add('a', repeat=1)
+        self.assertEqual('a', self.playlist.peek().key)
+        self.assertEqual('a', self.playlist.next().key)
+
+
+    def test_taken_entry_takes_its_turn(self):
+        self.playlist.add('a')
+        entry = self.playlist.add('b')
+        self.playlist.add('c')
+        self.assertIs(entry, self.playlist.take(entry))
+        self.assertEqual(list('acbac'), self._keys(5))
+
+    def test_taken_entry_counts_as_shown(self):
+        self.playlist.add('a')
+        entry = self.playlist.add('b', repeat=1)
+        self.playlist.take(entry)
+        self.assertEqual(list('aa'), self._keys(2))
+        self.assertIsNone(self.playlist.take(entry))
+
+    def test_expired_entry_is_not_taken(self):
+        entry = self.playlist.add('a', expires_in=10)
+        self.clock.now = 10
+        self.assertIsNone(self.playlist.take(entry))
+
+
+class ItemTests(unittest.TestCase):
+
+    def test_defaults(self):
+        self.assertEqual(Item('Hi', 0, None, None, None), Item('Hi'))
@@ -0,0 +1,109 @@
+from time import monotonic, sleep
+import unittest
+
+import numpy as np
+
+from sleepcounter.hardware_a.display.display import _Message
+from sleepcounter.hardware_a.display.framediff import FrameDiffDevice
+from sleepcounter.hardware_a.display.playlist import Item
+from sleepcounter.hardware_a.display.process import (
+    FrameRing,
+    ProcessLedMatrix)
+from sleepcounter.hardware_a.mocks import Matrix
+
+FRAME_SHAPE = (8, 4)
+SLOTS = 4
+WORKER_WAIT_SEC = 2
+
+
+class FrameRingTests(unittest.TestCase):
+
+    def setUp(self):
+        self.ring = FrameRing.create(FRAME_SHAPE, SLOTS)
+        self.reader = FrameRing.attach(self.ring.name, FRAME_SHAPE, SLOTS)
+
+    def tearDown(self):
+        self.reader.close()
+        self.ring.close()
+
+    def _frame(self, value):
+        return np.full(FRAME_SHAPE, value, np.uint8)
+
+    def test_empty(self):
+        self.assertEqual(0, self.reader.written)
+        self.assertIsNone(self.reader.latest())
+
+    def test_reader_sees_frames_written(self):
+        self.ring.write(self._frame(1))
+        self.ring.write(self._frame(2))
+        self.assertEqual(2, self.reader.written)
+        np.testing.assert_array_equal(self._frame(1), self.reader.read(0))
+        np.testing.assert_array_equal(self._frame(2), self.reader.latest())
+
+    def test_overwritten_frames_not_read(self):
+        for value in range(SLOTS + 1):
+            self.ring.write(self._frame(value))
+        self.assertIsNone(self.reader.read(0))
+        self.assertIsNone(self.reader.read(1))
+        np.testing.assert_array_equal(self._frame(2), self.reader.read(2))
+
+    def test_frames_are_copied(self):
+        self.ring.write(self._frame(1))
+        frame = self.reader.latest()
+        self.ring.write(self._frame(2))
+        np.testing.assert_array_equal(self._frame(1), frame)
+
+
+class ProcessLedMatrixTests(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.matrix = ProcessLedMatrix(Matrix, scroll_rate=1000, dwell=0.05)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.matrix.close()
+
+    def tearDown(self):
+        self.matrix.clear()
+
+    def _wait_for_frames(self, count):
+        deadline = monotonic() + WORKER_WAIT_SEC
+        while self.matrix.frames.written < count and monotonic() < deadline:
+            sleep(0.01)
+        return self.matrix.frames.written
+
+    def test_static_message_published(self):
+        # the registers are every other byte of the transactions
+        expected = _Message("Hi", scroll=False).frames(
+            FrameDiffDevice(Matrix()))[0][:, 1::2]
+        written = self.matrix.frames.written
+        self.matrix.show_messages(["Hi"])
+        self.assertGreater(self._wait_for_frames(written + 1), written)
+        np.testing.assert_array_equal(expected, self.matrix.frames.latest())
+
+    def test_scrolling_message_published(self):
+        written = self.matrix.frames.written
+        self.matrix.show_messages([Item("Christmas in 2 sleeps")])
+        self.assertGreaterEqual(
+            self._wait_for_frames(written + 10), written + 10)
+
+    def test_clear_publishes_blank_frame(self):
+        self.matrix.show_messages(["Hi"])
+        self.matrix.clear()
+        self.assertFalse(self.matrix.frames.latest().any())
+
+    def test_errors_raised_in_main_process(self):
+        with self.assertRaises(AttributeError):
+            self.matrix.show_messages([None])
+
+
+def _broken_device():
+    raise OSError("No SPI bus")
+
+
+class ProcessLedMatrixStartTests(unittest.TestCase):
+
+    def test_device_errors_raised_in_main_process(self):
+        with self.assertRaises(OSError):
+            ProcessLedMatrix(_broken_device)
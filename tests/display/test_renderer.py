@@ -0,0 +1,54 @@
+import asyncio
+import unittest
+from unittest.mock import Mock
+
+from luma.led_matrix.device import max7219
+
+from sleepcounter.hardware_a.display.renderer import AsyncLedMatrix
+
+WORKER_WAIT_SEC = 0.5
+
+
+class AsyncLedMatrixTests(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.matrix = AsyncLedMatrix(
+            max7219(Mock(), cascaded=4, block_orientation=-90, rotate=2),
+            scroll_rate=1000,
+            dwell=WORKER_WAIT_SEC / 10)
+
+    def tearDown(self):
+        self.matrix.clear()
+
+    async def test_lone_static_message_is_drawn_once(self):
+        self.matrix.show_messages(["Hi"])
+        await asyncio.sleep(WORKER_WAIT_SEC)
+        self.assertEqual(1, self.matrix.device.frames_sent)
+
+    async def test_static_messages_dwell_in_turn(self):
+        self.matrix.show_messages(["Hi", "Bye"])
+        await asyncio.sleep(WORKER_WAIT_SEC)
+        self.assertGreater(self.matrix.device.frames_sent, 2)
+        self.assertLess(self.matrix.device.frames_sent, 20)
+
+    async def test_scrolling_shares_the_loop(self):
+        ticks = []
+
+        async def tick():
+            while True:
+                ticks.append(self.matrix.device.frames_sent)
+                await asyncio.sleep(0.001)
+
+        ticker = asyncio.get_running_loop().create_task(tick())
+        self.matrix.show_messages(["Christmas in 2 sleeps"])
+        await asyncio.sleep(WORKER_WAIT_SEC / 5)
+        ticker.cancel()
+        self.assertGreater(len(set(ticks)), 2)
+
+    async def test_clear_stops_drawing(self):
+        self.matrix.show_messages(["Christmas in 2 sleeps"])
+        await asyncio.sleep(WORKER_WAIT_SEC / 10)
+        self.matrix.clear()
+        frames_sent = self.matrix.device.frames_sent
+        await asyncio.sleep(WORKER_WAIT_SEC / 10)
+        self.assertEqual(frames_sent, self.matrix.device.frames_sent)
@@ -0,0 +1,77 @@
+import unittest
+
+from sleepcounter.hardware_a.display.scheduler import FrameScheduler
+
+FRAME_RATE = 10
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def wait(self, duration):
+        self.now += duration
+
+
+class FrameSchedulerTests(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.scheduler = FrameScheduler(
+            FRAME_RATE, clock=self.clock, wait=self.clock.wait)
+
+    def test_all_frames_rendered_when_on_time(self):
+        frames = list(self.scheduler.frames(5))
+        self.assertEqual([0, 1, 2, 3, 4], frames)
+        self.assertEqual(0, self.scheduler.statistics.dropped)
+
+    def test_frames_paced_at_rate(self):
+        for _ in self.scheduler.frames(5):
+            pass
+        self.assertAlmostEqual(5 / FRAME_RATE, self.clock.now)
+        self.assertAlmostEqual(FRAME_RATE, self.scheduler.statistics.fps)
+
+    def test_render_time_does_not_slow_the_rate(self):
+        for _ in self.scheduler.frames(5):
+            self.clock.now += 0.05
+        self.assertAlmostEqual(5 / FRAME_RATE, self.clock.now)
+        self.assertAlmostEqual(
+            0.05, self.scheduler.statistics.mean_frame_time)
+
+    def test_late_frames_are_dropped(self):
+        rendered = []
+        for index in self.scheduler.frames(10):
+            rendered.append(index)
+            if index == 2:
+                self.clock.now += 0.35
+        self.assertEqual([0, 1, 2, 5, 6, 7, 8, 9], rendered)
+        self.assertEqual(2, self.scheduler.statistics.dropped)
+        self.assertAlmostEqual(10 / FRAME_RATE, self.clock.now)
+
+    def test_rate_must_be_positive(self):
+        with self.assertRaises(ValueError):
+            FrameScheduler(0)
+
+
+class AsyncFrameSchedulerTests(unittest.IsolatedAsyncioTestCase):
+
+    async def test_all_frames_rendered_when_on_time(self):
+        # a clock that stands still so that no frame is late
+        scheduler = FrameScheduler(50, clock=FakeClock())
+        frames = [index async for index in scheduler.frames_async(5)]
+        self.assertEqual([0, 1, 2, 3, 4], frames)
+        self.assertEqual(5, scheduler.statistics.rendered)
+
+    async def test_late_frames_are_dropped(self):
+        clock = FakeClock()
+        scheduler = FrameScheduler(FRAME_RATE, clock=clock)
+        rendered = []
+        async for index in scheduler.frames_async(10):
+            rendered.append(index)
+            clock.now += 0.35
+        self.assertEqual([0, 3, 7], rendered)
+        self.assertEqual(7, scheduler.statistics.dropped)
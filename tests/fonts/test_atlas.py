@@ -0,0 +1,55 @@
+import unittest
+
+from sleepcounter.hardware_a.fonts import atlas
+from sleepcounter.hardware_a.fonts.library import AVAILABLE_FONTS
+
+FONT_NAME = 'Vera.ttf'
+FONT_SIZE = 9
+
+
+class GlyphAtlasTests(unittest.TestCase):
+
+    def setUp(self):
+        self.atlas = atlas.GlyphAtlas(FONT_NAME, FONT_SIZE)
+
+    def test_atlas_available_for_every_font(self):
+        for font_name in AVAILABLE_FONTS:
+            self.assertIsNotNone(atlas.get_atlas(font_name, FONT_SIZE))
+
+    def test_glyph_is_cached(self):
+        self.assertIs(self.atlas.glyph('A'), self.atlas.glyph('A'))
+
+    def test_glyph_is_advance_wide_and_line_tall(self):
+        font = self.atlas._font # pylint: disable=protected-access
+        ascent, descent = font.getmetrics()
+        self.assertEqual(
+            (round(font.getlength('W')), ascent + descent),
+            self.atlas.glyph('W').size)
+
+    def test_glyph_has_ink(self):
+        self.assertIsNotNone(self.atlas.glyph('W').getbbox())
+
+    def test_text_width_is_sum_of_glyphs(self):
+        width, _ = self.atlas.text_size('AB')
+        expected = self.atlas.glyph('A').width + self.atlas.glyph('B').width
+        self.assertEqual(expected, width)
+
+    def test_render_matches_text_size(self):
+        image = self.atlas.render('HELLO')
+        self.assertEqual(self.atlas.text_size('HELLO'), image.size)
+        self.assertEqual("1", image.mode)
+
+    def test_render_is_composed_from_glyphs(self):
+        image = self.atlas.render('AB')
+        glyph = self.atlas.glyph('B')
+        offset = self.atlas.glyph('A').width
+        box = (offset, 0, offset + glyph.width, glyph.height)
+        self.assertEqual(glyph.tobytes(), image.crop(box).tobytes())
+
+    def test_empty_text(self):
+        self.assertEqual((0, 0), self.atlas.text_size(''))
+
+    def test_rendered_text_is_cached(self):
+        first = atlas.render_text(FONT_NAME, FONT_SIZE, 'CACHED')
+        second = atlas.render_text(FONT_NAME, FONT_SIZE, 'CACHED')
+        self.assertIs(first, second)
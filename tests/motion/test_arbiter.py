@@ -0,0 +1,122 @@
+# pylint: disable=protected-access
+import unittest
+from unittest.mock import Mock
+
+from sleepcounter.core.time.calendar import Calendar
+
+from sleepcounter.hardware_a.mocks import MockStage
+from sleepcounter.hardware_a.motion.arbiter import StageArbiter
+from sleepcounter.hardware_a.motion.planner import MotionPlanner
+from sleepcounter.hardware_a.widget.stage import SecondsStageWidget
+
+MAX_SPEED = 1000
+ACCELERATION = 2000
+MOVE_WAIT_SEC = 2
+
+
+class StageArbiterTests(unittest.TestCase):
+
+    def setUp(self):
+        self.stage = MockStage()
+        self.arbiter = StageArbiter(
+            self.stage, MotionPlanner(MAX_SPEED, ACCELERATION))
+        self.first_positions = []
+        self.second_positions = []
+        self.first = self.arbiter(
+            self.stage, on_position=self.first_positions.append)
+        self.second = self.arbiter(
+            self.stage, on_position=self.second_positions.append)
+
+    def tearDown(self):
+        self.arbiter.wait(MOVE_WAIT_SEC)
+
+    def test_latest_target_wins(self):
+        self.first.move_to(MockStage.MAX_POS)
+        self.second.move_to(10)
+        self.assertTrue(self.arbiter.wait(MOVE_WAIT_SEC))
+        self.assertEqual(10, self.stage.position)
+
+    def test_superseded_pending_targets_are_coalesced(self):
+        # hold the executor so that none of the targets is started early
+        with self.arbiter._executor._condition:
+            self.first.move_to(MockStage.MAX_POS)
+            self.second.move_to(20)
+            self.first.move_to(30)
+            self.assertEqual(1, self.arbiter.queue_depth)
+        self.arbiter.wait(MOVE_WAIT_SEC)
+        self.assertEqual(30, self.stage.position)
+        self.assertEqual(3, self.arbiter.statistics.submitted)
+        self.assertEqual(2, self.arbiter.statistics.coalesced)
+        self.assertEqual(1, self.arbiter.statistics.started)
+
+    def test_move_in_progress_is_cancelled(self):
+        self.first.move_to(MockStage.MAX_POS)
+        self.first.wait(0.01)
+        self.second.move_to(5)
+        self.arbiter.wait(MOVE_WAIT_SEC)
+        self.assertEqual(1, self.arbiter.statistics.cancelled)
+        self.assertEqual(5, self.stage.position)
+
+    def test_home_supersedes_move(self):
+        self.first.move_to(MockStage.MAX_POS)
+        self.first.wait(0.01)
+        self.second.home()
+        self.assertTrue(self.arbiter.wait(MOVE_WAIT_SEC))
+        self.assertEqual(0, self.stage.position)
+
+    def test_end(self):
+        self.first.end()
+        self.assertTrue(self.arbiter.wait(MOVE_WAIT_SEC))
+        self.assertEqual(MockStage.MAX_POS, self.stage.position)
+
+    def test_every_widget_told_of_position(self):
+        self.first.move_to(40)
+        self.arbiter.wait(MOVE_WAIT_SEC)
+        self.assertEqual([None, 40], self.first_positions)
+        self.assertEqual([None, 40], self.second_positions)
+
+    def test_reports_queue_depth_and_latency(self):
+        self.assertEqual(0, self.arbiter.queue_depth)
+        self.first.move_to(MockStage.MAX_POS)
+        self.first.wait(0.01)
+        self.second.move_to(6)
+        self.arbiter.wait(MOVE_WAIT_SEC)
+        self.assertEqual(0, self.arbiter.queue_depth)
+        statistics = self.arbiter.statistics
+        self.assertGreater(statistics.max_latency, 0)
+        self.assertLessEqual(statistics.mean_latency, statistics.max_latency)
+
+    def test_rejects_another_stage(self):
+        with self.assertRaises(ValueError):
+            self.arbiter(MockStage(), on_position=Mock())
+
+
+class SharedStageWidgetTests(unittest.TestCase):
+
+    def test_widget_homes_stage_through_arbiter(self):
+        stage = MockStage()
+        arbiter = StageArbiter(stage, MotionPlanner(MAX_SPEED, ACCELERATION))
+        arbiter.move_to(MockStage.MAX_POS)
+        arbiter.wait(0.01)
+        recovery = Mock()
+        recovery.recover.return_value = None
+        SecondsStageWidget(
+            stage, Calendar([]), recovery=recovery, executor=arbiter)
+        self.assertTrue(arbiter.idle)
+        self.assertEqual(MockStage.MIN_POS, stage.position)
+        self.assertEqual(1, arbiter.statistics.cancelled)
+
+    def test_widget_moves_again_after_stage_moved_by_another(self):
+        stage = MockStage()
+        arbiter = StageArbiter(stage, MotionPlanner(MAX_SPEED, ACCELERATION))
+        recovery = Mock()
+        recovery.recover.return_value = None
+        widget = SecondsStageWidget(
+            stage, Calendar([]), recovery=recovery, executor=arbiter)
+        widget._move_to(10)
+        self.assertTrue(arbiter.wait(MOVE_WAIT_SEC))
+        arbiter.move_to(50)
+        self.assertTrue(arbiter.wait(MOVE_WAIT_SEC))
+        widget._move_to(10)
+        self.assertTrue(arbiter.wait(MOVE_WAIT_SEC))
+        self.assertEqual(10, stage.position)
@@ -0,0 +1,55 @@
+import unittest
+from unittest.mock import Mock
+
+from stage import exceptions
+
+from sleepcounter.hardware_a.mocks import MockStage
+from sleepcounter.hardware_a.motion.calibration import CalibratedStage
+
+
+class _IndexedStage:
+    """A stage that keeps its position like the stage package's Stage"""
+    def __init__(self):
+        self._position = 0
+        self.max = 100
+        self.homed = False
+
+    def home(self):
+        self.homed = True
+        self._position = 0
+
+    @property
+    def position(self):
+        return self._position
+
+
+class CalibratedStageTests(unittest.TestCase):
+
+    def setUp(self):
+        self.stage = _IndexedStage()
+        self.calibrated = CalibratedStage.wrap(self.stage)
+
+    def test_calibrate_sets_position_without_homing(self):
+        self.calibrated.calibrate(42)
+        self.assertEqual(42, self.calibrated.position)
+        self.assertEqual(42, self.stage.position)
+        self.assertFalse(self.stage.homed)
+
+    def test_calibrate_out_of_range_raises(self):
+        with self.assertRaises(exceptions.OutOfRangeError):
+            self.calibrated.calibrate(101)
+        self.assertEqual(0, self.stage.position)
+
+    def test_passes_on_other_calls(self):
+        self.calibrated.home()
+        self.assertTrue(self.stage.homed)
+        self.assertEqual(100, self.calibrated.max)
+
+    def test_stage_with_calibrate_is_not_wrapped(self):
+        stage = MockStage()
+        self.assertIs(stage, CalibratedStage.wrap(stage))
+
+    def test_stage_without_position_is_not_wrapped(self):
+        stage = Mock(spec=['home', 'position', 'max'])
+        with self.assertLogs('calibration', 'WARNING'):
+            self.assertIs(stage, CalibratedStage.wrap(stage))
@@ -0,0 +1,130 @@
+import asyncio
+import unittest
+from unittest.mock import patch
+
+from sleepcounter.hardware_a.mocks import MockStage
+from sleepcounter.hardware_a.motion.executor import (
+    AsyncMotionExecutor,
+    MotionExecutor)
+from sleepcounter.hardware_a.motion.planner import MotionPlanner
+
+MAX_SPEED = 1000
+ACCELERATION = 2000
+MOVE_WAIT_SEC = 2
+
+
+class MotionPlannerTests(unittest.TestCase):
+
+    def setUp(self):
+        self.planner = MotionPlanner(MAX_SPEED, ACCELERATION)
+
+    def test_move_visits_every_position(self):
+        positions = [pos for pos, _ in self.planner.plan(3, 8)]
+        self.assertEqual([4, 5, 6, 7, 8], positions)
+
+    def test_move_towards_home(self):
+        positions = [pos for pos, _ in self.planner.plan(5, 2)]
+        self.assertEqual([4, 3, 2], positions)
+
+    def test_no_steps_when_already_at_target(self):
+        self.assertEqual(0, len(self.planner.plan(5, 5)))
+
+    def test_move_ramps_up_and_down(self):
+        intervals = [interval for _, interval in self.planner.plan(0, 1000)]
+        self.assertGreater(intervals[0], intervals[500])
+        self.assertGreater(intervals[-1], intervals[500])
+        self.assertAlmostEqual(1 / MAX_SPEED, intervals[500])
+
+    def test_speed_never_exceeds_maximum(self):
+        for _, interval in self.planner.plan(0, 1000):
+            self.assertGreaterEqual(interval, 1 / MAX_SPEED)
+
+    def test_rejects_invalid_limits(self):
+        with self.assertRaises(ValueError):
+            MotionPlanner(max_speed=0)
+
+
+class MotionExecutorTests(unittest.TestCase):
+
+    def setUp(self):
+        self.stage = MockStage()
+        self.executor = MotionExecutor(
+            self.stage, MotionPlanner(MAX_SPEED, ACCELERATION))
+
+    def test_moves_to_target(self):
+        self.executor.move_to(50)
+        self.assertTrue(self.executor.wait(MOVE_WAIT_SEC))
+        self.assertEqual(50, self.stage.position)
+
+    def test_move_to_returns_before_move_finishes(self):
+        self.executor.move_to(MockStage.MAX_POS)
+        self.assertNotEqual(MockStage.MAX_POS, self.stage.position)
+        self.executor.wait(MOVE_WAIT_SEC)
+
+    def test_new_target_supersedes_move(self):
+        self.executor.move_to(MockStage.MAX_POS)
+        self.executor.move_to(10)
+        self.assertTrue(self.executor.wait(MOVE_WAIT_SEC))
+        self.assertEqual(10, self.stage.position)
+
+    def test_idle_when_finished(self):
+        self.executor.move_to(5)
+        self.executor.wait(MOVE_WAIT_SEC)
+        self.assertTrue(self.executor.idle)
+
+    def test_keeps_running_after_failed_move(self):
+        with patch.object(
+                MockStage, 'home', side_effect=RuntimeError("Stuck")):
+            with self.assertLogs('motion executor', 'ERROR'):
+                self.executor.home()
+                self.assertTrue(self.executor.wait(MOVE_WAIT_SEC))
+        self.executor.move_to(5)
+        self.assertTrue(self.executor.wait(MOVE_WAIT_SEC))
+        self.assertEqual(5, self.stage.position)
+
+
+class AsyncMotionExecutorTests(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.stage = MockStage()
+        self.positions = []
+        self.executor = AsyncMotionExecutor(
+            self.stage,
+            MotionPlanner(MAX_SPEED, ACCELERATION),
+            on_position=self.positions.append)
+
+    def tearDown(self):
+        self.executor.stop()
+
+    async def test_moves_to_target(self):
+        self.executor.move_to(50)
+        self.assertTrue(await self.executor.wait(MOVE_WAIT_SEC))
+        self.assertEqual(50, self.stage.position)
+        self.assertEqual([None, 50], self.positions)
+
+    async def test_move_to_returns_before_move_finishes(self):
+        self.executor.move_to(MockStage.MAX_POS)
+        self.assertFalse(self.executor.idle)
+        self.assertNotEqual(MockStage.MAX_POS, self.stage.position)
+
+    async def test_new_target_supersedes_move(self):
+        self.executor.move_to(MockStage.MAX_POS)
+        await asyncio.sleep(0.01)
+        self.executor.move_to(10)
+        self.assertTrue(await self.executor.wait(MOVE_WAIT_SEC))
+        self.assertEqual(10, self.stage.position)
+        self.assertEqual([None, 10], self.positions)
+
+    async def test_other_tasks_run_while_moving(self):
+        ticks = []
+
+        async def tick():
+            while True:
+                ticks.append(self.stage.position)
+                await asyncio.sleep(0.001)
+
+        ticker = asyncio.get_running_loop().create_task(tick())
+        self.executor.move_to(50)
+        await self.executor.wait(MOVE_WAIT_SEC)
+        ticker.cancel()
+        self.assertGreater(len(set(ticks)), 2)
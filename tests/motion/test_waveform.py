@@ -0,0 +1,141 @@
+import unittest
+from unittest.mock import Mock, call
+
+import numpy as np
+
+from sleepcounter.hardware_a.mocks import FakeGpioSink, MockStage
+from sleepcounter.hardware_a.motion.planner import MotionPlanner
+from sleepcounter.hardware_a.motion.waveform import (
+    FULL_STEP,
+    GpioSink,
+    Waveform,
+    WaveformExecutor,
+    WaveformPlayer)
+
+MAX_SPEED = 1000
+ACCELERATION = 2000
+MOVE_WAIT_SEC = 2
+# how late a step may be written when the machine is busy
+LATE_SEC = 0.005
+
+
+class WaveformTests(unittest.TestCase):
+
+    def setUp(self):
+        self.planner = MotionPlanner(MAX_SPEED, ACCELERATION)
+
+    def test_intervals_match_move(self):
+        move = self.planner.plan(0, 300)
+        np.testing.assert_allclose(
+            [interval for _, interval in move], move.intervals())
+
+    def test_compiles_every_step(self):
+        move = self.planner.plan(3, 40)
+        waveform = Waveform.compile(move)
+        self.assertEqual(
+            [pos for pos, _ in move], waveform.positions.tolist())
+        self.assertAlmostEqual(move.duration, waveform.duration)
+        self.assertTrue(np.all(np.diff(waveform.times) > 0))
+
+    def test_steps_through_sequence(self):
+        waveform = Waveform.compile(self.planner.plan(0, 8))
+        self.assertEqual(list(FULL_STEP[1:] + FULL_STEP + FULL_STEP[:1]),
+                         waveform.states.tolist())
+
+    def test_reverses_sequence_towards_home(self):
+        waveform = Waveform.compile(self.planner.plan(4, 0))
+        self.assertEqual(
+            [FULL_STEP[3], FULL_STEP[2], FULL_STEP[1], FULL_STEP[0]],
+            waveform.states.tolist())
+
+    def test_empty_move(self):
+        waveform = Waveform.compile(self.planner.plan(5, 5))
+        self.assertEqual(0, len(waveform))
+        self.assertEqual(0, waveform.duration)
+
+
+class WaveformPlayerTests(unittest.TestCase):
+
+    def setUp(self):
+        self.sink = FakeGpioSink()
+        self.player = WaveformPlayer(self.sink)
+        self.waveform = Waveform.compile(
+            MotionPlanner(MAX_SPEED, ACCELERATION).plan(0, 50))
+
+    def test_writes_every_state_on_time(self):
+        self.assertEqual(50, self.player.play(self.waveform))
+        self.assertEqual(self.waveform.states.tolist(), self.sink.states)
+        times = np.array([time for time, _ in self.sink.writes])
+        offsets = (times - times[0]) - (
+            self.waveform.times - self.waveform.times[0])
+        self.assertTrue(np.all(offsets > -LATE_SEC))
+        self.assertLess(np.median(np.abs(offsets)), LATE_SEC)
+
+    def test_stops_when_cancelled(self):
+        played = self.player.play(
+            self.waveform, lambda: len(self.sink.writes) == 10)
+        self.assertEqual(10, played)
+        self.assertEqual(10, len(self.sink.writes))
+
+
+class GpioSinkTests(unittest.TestCase):
+
+    def setUp(self):
+        self.gpio = Mock()
+        self.sink = GpioSink(self.gpio, (26, 19, 13, 6))
+
+    def test_sets_up_pins(self):
+        self.gpio.setup.assert_has_calls(
+            [call(pin, self.gpio.OUT) for pin in (26, 19, 13, 6)])
+
+    def test_writes_changed_pins(self):
+        self.sink.write(0b0011)
+        self.gpio.output.reset_mock()
+        self.sink.write(0b0110)
+        self.assertEqual(
+            [call(26, 0), call(13, 1)], self.gpio.output.call_args_list)
+
+
+class WaveformExecutorTests(unittest.TestCase):
+
+    def setUp(self):
+        self.stage = MockStage()
+        self.sink = FakeGpioSink()
+        self.executor = WaveformExecutor(
+            self.stage,
+            MotionPlanner(MAX_SPEED, ACCELERATION),
+            sink=self.sink)
+
+    def test_moves_to_target(self):
+        self.executor.move_to(50)
+        self.assertTrue(self.executor.wait(MOVE_WAIT_SEC))
+        self.assertEqual(50, self.stage.position)
+        self.assertEqual(50, len(self.sink.writes))
+
+    def test_new_target_supersedes_move(self):
+        self.executor.move_to(MockStage.MAX_POS)
+        self.executor.wait(0.01)
+        self.executor.move_to(10)
+        self.assertTrue(self.executor.wait(MOVE_WAIT_SEC))
+        self.assertEqual(10, self.stage.position)
+        self.assertEqual(1, self.executor.statistics.cancelled)
+        self.assertEqual(FULL_STEP[10 % len(FULL_STEP)], self.sink.states[-1])
+
+    def test_out_of_range_target_not_played(self):
+        with self.assertLogs('motion executor', 'ERROR'):
+            self.executor.move_to(MockStage.MAX_POS + 1)
+            self.executor.wait(MOVE_WAIT_SEC)
+        self.assertEqual(0, self.stage.position)
+        self.assertEqual([], self.sink.writes)
+
+    def test_rejects_stage_that_cant_be_calibrated(self):
+        stage = Mock(spec=['home', 'end', 'max', 'position'])
+        with self.assertRaises(ValueError):
+            WaveformExecutor(stage, sink=self.sink)
+
+    def test_stage_homes_itself(self):
+        self.stage.calibrate(20)
+        self.executor.home()
+        self.assertTrue(self.executor.wait(MOVE_WAIT_SEC))
+        self.assertEqual(0, self.stage.position)
+        self.assertEqual([], self.sink.writes)
@@ -0,0 +1,79 @@
+import os
+import tempfile
+import unittest
+
+from sleepcounter.hardware_a.persistence.journal import StateJournal
+
+CAPACITY = 4
+EVENT_ID = 1234
+RECORD_SIZE = 32
+
+
+class StateJournalTests(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'journal')
+        self.journal = StateJournal(
+            self.path, capacity=CAPACITY, flush_interval=60)
+
+    def tearDown(self):
+        self.journal.close()
+        self.directory.cleanup()
+
+    def test_empty_journal_has_no_last_entry(self):
+        self.assertIsNone(self.journal.last())
+
+    def test_last_entry_is_latest_state(self):
+        self.journal.append(1000, 10, EVENT_ID)
+        self.journal.append(1000, 20, EVENT_ID)
+        last = self.journal.last()
+        self.assertEqual(1000, last.total_time)
+        self.assertEqual(20, last.position)
+        self.assertEqual(EVENT_ID, last.event_id)
+
+    def test_unknown_values_are_recovered_as_none(self):
+        self.journal.append(None, None, EVENT_ID)
+        last = self.journal.last()
+        self.assertIsNone(last.total_time)
+        self.assertIsNone(last.position)
+
+    def test_state_recovered_by_new_journal(self):
+        self.journal.append(1000, 30, EVENT_ID)
+        self.journal.close()
+        self.journal = StateJournal(self.path, capacity=CAPACITY)
+        self.assertEqual(30, self.journal.last().position)
+
+    def test_appends_are_not_flushed_immediately(self):
+        self.journal.append(1000, 30, EVENT_ID)
+        self.assertEqual(0, self.journal.flushes)
+        self.journal.flush()
+        self.assertEqual(1, self.journal.flushes)
+
+    def test_forced_append_is_flushed_immediately(self):
+        self.journal.append(1000, None, EVENT_ID, flush=True)
+        self.assertEqual(1, self.journal.flushes)
+
+    def test_compacts_when_full(self):
+        for position in range(CAPACITY + 1):
+            self.journal.append(1000, position, EVENT_ID)
+        self.assertEqual(2, len(self.journal))
+        self.assertEqual(CAPACITY, self.journal.last().position)
+
+    def test_damaged_last_record_is_skipped(self):
+        self.journal.append(1000, 10, EVENT_ID)
+        self.journal.append(1000, 20, EVENT_ID)
+        self.journal.close()
+        with open(self.path, 'r+b') as fp:
+            # skip the header and first record to damage the second record
+            fp.seek(RECORD_SIZE * 2 + 8)
+            fp.write(b'\xff')
+        self.journal = StateJournal(self.path, capacity=CAPACITY)
+        self.assertEqual(10, self.journal.last().position)
+
+    def test_invalid_file_is_replaced(self):
+        self.journal.close()
+        with open(self.path, 'wb') as fp:
+            fp.write(b'not a journal')
+        self.journal = StateJournal(self.path, capacity=CAPACITY)
+        self.assertIsNone(self.journal.last())
@@ -0,0 +1,82 @@
+import os
+import pickle
+import tempfile
+from time import sleep
+import unittest
+
+from sleepcounter.hardware_a.persistence.store import (
+    CorruptDataError,
+    RecordStore,
+    decode,
+    encode)
+
+DATA = (1000, 'xmas', 42)
+WRITE_DELAY_SEC = 0.2
+
+
+class RecordFormatTests(unittest.TestCase):
+
+    def test_round_trip(self):
+        self.assertEqual(DATA, decode(encode(DATA)))
+
+    def test_truncated_record_is_corrupt(self):
+        record = encode(DATA)
+        with self.assertRaises(CorruptDataError):
+            decode(record[:-1])
+
+    def test_damaged_record_is_corrupt(self):
+        record = bytearray(encode(DATA))
+        record[-1] ^= 0xff
+        with self.assertRaises(CorruptDataError):
+            decode(bytes(record))
+
+    def test_legacy_pickle_is_read(self):
+        self.assertEqual(DATA, decode(pickle.dumps(DATA)))
+
+    def test_truncated_legacy_pickle_is_corrupt(self):
+        with self.assertRaises(CorruptDataError):
+            decode(pickle.dumps(DATA)[:5])
+
+    def test_legacy_pickle_of_unknown_class_is_corrupt(self):
+        for record in (b'cno_such_module\nthing\n.', b'cos\nno_such_thing\n.'):
+            with self.assertRaises(CorruptDataError):
+                decode(record)
+
+
+class RecordStoreTests(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'record')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_written_data_is_read_back(self):
+        RecordStore(self.path).write(DATA)
+        self.assertEqual(DATA, RecordStore(self.path).read())
+
+    def test_no_temporary_files_left_behind(self):
+        RecordStore(self.path).write(DATA)
+        self.assertEqual(['record'], os.listdir(self.directory.name))
+
+    def test_identical_writes_are_skipped(self):
+        store = RecordStore(self.path)
+        store.write(DATA)
+        store.write(DATA)
+        self.assertEqual(1, store.writes)
+
+    def test_delayed_writes_are_coalesced(self):
+        store = RecordStore(self.path, write_delay=WRITE_DELAY_SEC)
+        for position in range(10):
+            store.write((1000, 'xmas', position))
+        self.assertFalse(os.path.exists(self.path))
+        sleep(WRITE_DELAY_SEC * 2)
+        self.assertEqual(1, store.writes)
+        self.assertEqual((1000, 'xmas', 9), RecordStore(self.path).read())
+
+    def test_flush_writes_pending_data(self):
+        store = RecordStore(self.path, write_delay=60)
+        store.write(DATA)
+        store.flush()
+        self.assertEqual(DATA, RecordStore(self.path).read())
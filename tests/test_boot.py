@@ -0,0 +1,77 @@
+import contextlib
+import io
+import threading
+import unittest
+from unittest.mock import AsyncMock, Mock
+
+from sleepcounter.hardware_a.__main__ import (
+    boot,
+    boot_async,
+    parse_args)
+
+HOMING_WAIT_SEC = 2
+
+
+class BootTests(unittest.TestCase):
+
+    def setUp(self):
+        self.homed = threading.Event()
+        self.display_widget = Mock()
+        self.stage_widget = Mock()
+
+    def make_stage_widget(self):
+        # homing only finishes once the display has been updated
+        if not self.homed.wait(HOMING_WAIT_SEC):
+            raise TimeoutError("Stage widget made before display updated")
+        return self.stage_widget
+
+    def test_display_updated_while_stage_homes(self):
+        self.display_widget.update.side_effect = self.homed.set
+        widgets = boot(lambda: self.display_widget, self.make_stage_widget)
+        self.assertEqual([self.display_widget, self.stage_widget], widgets)
+        self.display_widget.update.assert_called_once()
+
+    def test_stage_error_raised(self):
+        def fail():
+            raise RuntimeError("Homing failed")
+
+        with self.assertRaises(RuntimeError):
+            boot(lambda: self.display_widget, fail)
+
+
+class BootAsyncTests(unittest.IsolatedAsyncioTestCase):
+
+    async def test_display_updated_while_stage_homes(self):
+        homed = threading.Event()
+        display_widget = Mock()
+        display_widget.update_async = AsyncMock(side_effect=homed.set)
+        stage_widget = Mock()
+
+        def make_stage_widget():
+            if not homed.wait(HOMING_WAIT_SEC):
+                raise TimeoutError("Stage widget made before display updated")
+            return stage_widget
+
+        widgets = await boot_async(lambda: display_widget, make_stage_widget)
+        self.assertEqual([display_widget, stage_widget], widgets)
+        display_widget.update_async.assert_awaited_once()
+
+
+class ParseArgsTests(unittest.TestCase):
+
+    def assert_rejected(self, argv):
+        with contextlib.redirect_stderr(io.StringIO()):
+            with self.assertRaises(SystemExit):
+                parse_args(argv)
+
+    def test_threaded_options_accepted(self):
+        args = parse_args(['--waveform', '--render-process'])
+        self.assertTrue(args.waveform)
+        self.assertTrue(args.render_process)
+        self.assertFalse(args.asyncio)
+
+    def test_waveform_rejected_with_asyncio(self):
+        self.assert_rejected(['--asyncio', '--waveform'])
+
+    def test_render_process_rejected_with_asyncio(self):
+        self.assert_rejected(['--asyncio', '--render-process'])
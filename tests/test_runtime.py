@@ -0,0 +1,73 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from unittest.mock import AsyncMock, Mock
+
+from sleepcounter.core.time.calendar import Calendar
+from sleepcounter.core.time.event import Anniversary
+
+from sleepcounter.hardware_a.mocks import MockStage
+from sleepcounter.hardware_a.motion.executor import AsyncMotionExecutor
+from sleepcounter.hardware_a.runtime import AsyncApplication
+from sleepcounter.hardware_a.widget.display import LedMatrixWidget
+from sleepcounter.hardware_a.widget.stage import SecondsStageWidget
+
+CHRISTMAS = Anniversary(name='Christmas', month=12, day=25,)
+UPDATES_PER_SEC = 20
+RUN_SEC = 0.5
+
+
+class AsyncApplicationTests(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        calendar = Calendar([CHRISTMAS])
+        self.display = Mock()
+        self.stage = MockStage()
+        self.widgets = [
+            LedMatrixWidget(self.display, calendar),
+            SecondsStageWidget(
+                self.stage,
+                calendar,
+                recovery_file=os.path.join(self.directory.name, 'recovery'),
+                executor=AsyncMotionExecutor),
+        ]
+        for widget in self.widgets:
+            widget.mins_between_updates = 1 / (60 * UPDATES_PER_SEC)
+        self.app = AsyncApplication(self.widgets)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    async def _run(self):
+        task = asyncio.get_running_loop().create_task(self.app.run())
+        await asyncio.sleep(RUN_SEC)
+        self.app.stop()
+        await task
+
+    async def test_widgets_updated_on_interval(self):
+        updates = Mock(side_effect=self.widgets[0].update)
+        self.widgets[0].update = updates
+        await self._run()
+        n_updates = updates.call_count
+        self.assertGreater(n_updates, UPDATES_PER_SEC * RUN_SEC / 2)
+        self.assertLessEqual(n_updates, UPDATES_PER_SEC * RUN_SEC + 1)
+
+    async def test_failing_widget_does_not_stop_others(self):
+        self.display.show_messages.side_effect = RuntimeError
+        stage_widget = self.widgets[1]
+        updates = Mock(side_effect=stage_widget.update)
+        stage_widget.update = updates
+        stage_widget.seconds_to_next_update = Mock(return_value=None)
+        await self._run()
+        self.assertGreater(updates.call_count, 1)
+
+    async def test_widget_updated_when_it_predicts(self):
+        widget = Mock(mins_between_updates=60)
+        widget.update_async = AsyncMock()
+        widget.seconds_to_next_update.return_value = RUN_SEC / 5
+        self.widgets[:] = [widget]
+        await self._run()
+        self.assertGreaterEqual(widget.update_async.await_count, 4)
+        self.assertLessEqual(widget.update_async.await_count, 6)
@@ -10,7 +10,10 @@ from sleepcounter.core.time.calendar import Calendar
 from sleepcounter.core.time.event import Anniversary, SpecialDay
 from sleepcounter.core.mocks import mock_datetime
 from sleepcounter.core.widget import BaseWidget
-from sleepcounter.hardware_a.widget.display import LedMatrixWidget
+from sleepcounter.hardware_a.display.playlist import Item
+from sleepcounter.hardware_a.widget.display import (
+    SPECIAL_DAY_PRIORITY,
+    LedMatrixWidget)
 
 CHRISTMAS_DAY = Anniversary(name='Christmas', month=12, day=25,)
 NEW_YEARS_DAY = Anniversary(name="New Year\'s Day", month=1, day=1,)
@@ -95,3 +98,58 @@ class DisplayUpdateTests(TestBase):
         with mock_datetime(target=today):
             sleep(WIDGET_UPDATE_WAIT_SEC)
         self.mock_matrix.show_message.assert_called_with("It's Christmas!")
+
+
+class MessageChangeTests(unittest.TestCase):
+
+    def setUp(self):
+        self.mock_matrix = Mock()
+        self.display_widget = LedMatrixWidget(self.mock_matrix, CALENDAR)
+        self.today = datetime.datetime(
+            year=2018,
+            month=12,
+            day=23,
+            hour=12,
+            minute=10)
+
+    def test_unchanged_messages_are_not_shown_again(self):
+        with mock_datetime(target=self.today):
+            self.display_widget.update()
+            self.display_widget.update()
+        self.mock_matrix.show_messages.assert_called_once()
+
+    def test_changed_messages_are_shown(self):
+        with mock_datetime(target=self.today):
+            self.display_widget.update()
+        with mock_datetime(target=self.today + datetime.timedelta(days=1)):
+            self.display_widget.update()
+        self.assertEqual(2, self.mock_matrix.show_messages.call_count)
+        (messages,), _ = self.mock_matrix.show_messages.call_args
+        self.assertIn('Christmas in 1 sleep . . . ', messages)
+
+    def test_failed_messages_are_shown_again(self):
+        self.mock_matrix.show_messages.side_effect = [OSError, None]
+        with mock_datetime(target=self.today):
+            with self.assertRaises(OSError):
+                self.display_widget.update()
+            self.display_widget.update()
+        self.assertEqual(2, self.mock_matrix.show_messages.call_count)
+
+    def test_display_is_not_cleared(self):
+        with mock_datetime(target=self.today):
+            self.display_widget.update()
+        self.mock_matrix.clear.assert_not_called()
+
+    def test_special_day_message_pre_empts(self):
+        christmas = datetime.datetime(
+            year=2018,
+            month=12,
+            day=25,
+            hour=17,
+            minute=9)
+        with mock_datetime(target=christmas):
+            self.display_widget.update()
+        (messages,), _ = self.mock_matrix.show_messages.call_args
+        self.assertEqual(
+            [Item("It's Christmas!", priority=SPECIAL_DAY_PRIORITY)],
+            messages)
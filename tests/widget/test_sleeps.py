@@ -0,0 +1,72 @@
+import datetime
+import unittest
+from unittest.mock import Mock
+
+from sleepcounter.core.mocks import mock_datetime
+from sleepcounter.core.time.calendar import Calendar
+from sleepcounter.core.time.event import Anniversary
+
+from sleepcounter.hardware_a.widget.display import LedMatrixWidget
+from sleepcounter.hardware_a.widget.sleeps import SleepsCache
+
+CHRISTMAS = Anniversary(name='Christmas', month=12, day=25,)
+NEW_YEARS_DAY = Anniversary(name="New Year's Day", month=1, day=1,)
+BURNS_NIGHT = Anniversary(name="Burns Night", month=1, day=25,)
+TODAY = datetime.datetime(year=2018, month=12, day=20, hour=12, minute=10)
+
+
+class SleepsCacheTests(unittest.TestCase):
+
+    def setUp(self):
+        self.calendar = Calendar([BURNS_NIGHT, NEW_YEARS_DAY, CHRISTMAS])
+        self.cache = SleepsCache(self.calendar)
+
+    def test_events_soonest_first(self):
+        with mock_datetime(target=TODAY):
+            events = self.cache.next_events()
+        self.assertEqual(
+            [(CHRISTMAS, 5), (NEW_YEARS_DAY, 12), (BURNS_NIGHT, 36)],
+            events)
+
+    def test_next_events(self):
+        with mock_datetime(target=TODAY):
+            events = self.cache.next_events(2)
+        self.assertEqual([CHRISTMAS, NEW_YEARS_DAY], [e for e, _ in events])
+
+    def test_counted_once_a_day(self):
+        with mock_datetime(target=TODAY):
+            self.cache.next_events()
+        with mock_datetime(target=TODAY + datetime.timedelta(hours=1)):
+            self.cache.next_events()
+        self.assertEqual(1, self.cache.rebuilds)
+
+    def test_counted_again_the_next_day(self):
+        with mock_datetime(target=TODAY):
+            self.cache.next_events()
+        with mock_datetime(target=TODAY + datetime.timedelta(days=1)):
+            events = self.cache.next_events(1)
+        self.assertEqual(2, self.cache.rebuilds)
+        self.assertEqual([(CHRISTMAS, 4)], events)
+
+    def test_invalidate(self):
+        with mock_datetime(target=TODAY):
+            self.cache.next_events()
+            self.cache.invalidate()
+            self.cache.next_events()
+        self.assertEqual(2, self.cache.rebuilds)
+
+
+class LedMatrixWidgetMaxEventsTests(unittest.TestCase):
+
+    def test_only_next_events_shown(self):
+        display = Mock()
+        widget = LedMatrixWidget(
+            display,
+            Calendar([BURNS_NIGHT, NEW_YEARS_DAY, CHRISTMAS]),
+            max_events=2)
+        with mock_datetime(target=TODAY):
+            widget.update()
+        display.show_messages.assert_called_once_with([
+            "Christmas in 5 sleeps . . . ",
+            "New Year's Day in 12 sleeps . . . ",
+        ])
@@ -2,6 +2,7 @@ import datetime
 import os
 import sys
 from time import sleep
+import pickle
 import unittest
 from unittest.mock import Mock
 
@@ -11,6 +12,8 @@ from sleepcounter.core.time.calendar import Calendar
 from sleepcounter.core.time.event import Anniversary
 from sleepcounter.core.widget import BaseWidget
 from sleepcounter.hardware_a.widget.stage import (
+    MIN_SECONDS_BETWEEN_SLEEPS,
+    RecoveryJournal,
     SecondsStageWidget,
     SleepsStageWidget,
     DEFAULT_RECOVERY_FILE)
@@ -111,6 +114,37 @@ class StageWidgetStoresPerisistentData(TestBase):
         # the position should be same as before it went down
         self.assertEqual(pos_after, pos_before)
 
+    def test_restart_resumes_without_homing(self):
+        self.stage_widget = SecondsStageWidget(
+            stage=self.mock_stage,
+            calendar=CALENDAR)
+        self.stage_widget.start()
+        today = JUST_BEFORE_XMAS
+        with mock_datetime(target=today):
+            sleep(WIDGET_UPDATE_WAIT_SEC)
+        today += datetime.timedelta(days=1)
+        with mock_datetime(target=today):
+            sleep(WIDGET_UPDATE_WAIT_SEC)
+            pos_before = self.mock_stage.position
+            # system goes down and the widget is reinitialised
+            self.stage_widget.stop()
+            self.mock_stage = MockStage()
+            self.mock_stage.home = Mock()
+            self.stage_widget = SecondsStageWidget(
+                stage=self.mock_stage,
+                calendar=CALENDAR)
+        self.mock_stage.home.assert_not_called()
+        self.assertEqual(pos_before, self.mock_stage.position)
+
+    def test_restart_homes_when_recovery_data_corrupt(self):
+        with open(DEFAULT_RECOVERY_FILE, 'wb') as fp:
+            fp.write(pickle.dumps((1000, CHRISTMAS_DAY, 50))[:10])
+        self.mock_stage.home = Mock()
+        self.stage_widget = SecondsStageWidget(
+            stage=self.mock_stage,
+            calendar=CALENDAR)
+        self.mock_stage.home.assert_called_once_with()
+
     def test_reinitialised_after_event_should_reset(self):
         self.stage_widget = SecondsStageWidget(
             stage=self.mock_stage,
@@ -259,4 +293,79 @@ class SleepsStageWidgetDisplaysTime(TestBase):
         # stage should have moved now.
         with mock_datetime(target=wake_up_time):
             sleep(WIDGET_UPDATE_WAIT_SEC)
-        self.assertGreater(self.mock_stage.position, MockStage.MIN_POS)
\ No newline at end of file
+        self.assertGreater(self.mock_stage.position, MockStage.MIN_POS)
+
+class RecoveryJournalFlushes(unittest.TestCase):
+
+    def setUp(self):
+        self.journal = RecoveryJournal(
+            ALTERNATIVE_FILE_PATH, CALENDAR, flush_interval=60)
+
+    def tearDown(self):
+        self.journal.flush()
+        os.remove(ALTERNATIVE_FILE_PATH)
+
+    def test_start_of_move_flushed_immediately(self):
+        # pylint: disable=protected-access
+        self.journal.record((1000, CHRISTMAS_DAY, 10))
+        self.assertEqual(0, self.journal._journal.flushes)
+        self.journal.record((1000, CHRISTMAS_DAY, None))
+        self.assertEqual(1, self.journal._journal.flushes)
+
+
+class StageWidgetPredictsUpdates(unittest.TestCase):
+
+    def _make_widget(self, widget_class, stage_max):
+        recovery = Mock()
+        recovery.recover.return_value = None
+        self.executor = Mock()
+        return widget_class(
+            Mock(max=stage_max),
+            CALENDAR,
+            recovery=recovery,
+            executor=self.executor)
+
+    def test_seconds_to_next_step(self):
+        widget = self._make_widget(SecondsStageWidget, 100)
+        with mock_datetime(target=JUST_BEFORE_XMAS):
+            widget.update()
+            total = CALENDAR.seconds_to_next_event
+            self.assertAlmostEqual(
+                total / 100, widget.seconds_to_next_update(), places=3)
+
+    def test_no_move_until_next_step(self):
+        widget = self._make_widget(SecondsStageWidget, 100)
+        with mock_datetime(target=JUST_BEFORE_XMAS):
+            widget.update()
+            step = widget.seconds_to_next_update()
+        motion = self.executor.return_value
+        for seconds in (1, step / 2, step - 1):
+            later = JUST_BEFORE_XMAS + datetime.timedelta(seconds=seconds)
+            with mock_datetime(target=later):
+                widget.update()
+        self.assertEqual(1, motion.move_to.call_count)
+        later = JUST_BEFORE_XMAS + datetime.timedelta(seconds=step + 1)
+        with mock_datetime(target=later):
+            widget.update()
+        motion.move_to.assert_called_with(1)
+
+    def test_sleeps_to_next_step_are_at_least_a_day_each(self):
+        widget = self._make_widget(SleepsStageWidget, 5)
+        with mock_datetime(target=JUST_BEFORE_XMAS):
+            widget.update()
+            # 22 sleeps over 5 steps is 4.4 sleeps to the first step, the
+            # last 4 of which are known to take at least a day
+            self.assertEqual(
+                4 * MIN_SECONDS_BETWEEN_SLEEPS,
+                widget.seconds_to_next_update())
+
+    def test_next_sleep_unknown(self):
+        widget = self._make_widget(SleepsStageWidget, 100)
+        with mock_datetime(target=JUST_BEFORE_XMAS):
+            widget.update()
+            self.assertIsNone(widget.seconds_to_next_update())
+
+    def test_unknown_before_first_update(self):
+        widget = self._make_widget(SecondsStageWidget, 100)
+        with mock_datetime(target=JUST_BEFORE_XMAS):
+            self.assertIsNone(widget.seconds_to_next_update())